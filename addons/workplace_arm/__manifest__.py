@@ -1,6 +1,6 @@
 {
     'name': 'Workplace ARM',
-    'version': '4.0',
+    'version': '4.4',
     'category': 'Manufacturing',
     'summary': 'Workplace management and ARM integration',
     'description': """
@@ -12,18 +12,32 @@
     """,
     'author': 'Your Company',
     'website': 'https://www.yourcompany.com',
-    'depends': ['base', 'web', 'mrp', 'maintenance'],
+    'depends': ['base', 'web', 'bus', 'mrp', 'maintenance'],
     'data': [
         'security/ir.model.access.csv',
         'views/workplace_views.xml',
         'views/workplace_task_views.xml',
+        'views/workplace_task_history_views.xml',
+        'views/workplace_task_event_views.xml',
+        'views/workplace_stats_views.xml',
+        'views/workplace_action_stat_views.xml',
+        'views/workplace_job_views.xml',
+        'views/mrp_production_views.xml',
         'views/menu_views.xml',
         'data/wizard_views.xml',
+        'data/ir_cron.xml',
         'data/demo_data.xml',
     ],
+    'assets': {
+        'web.assets_backend': [
+            'workplace_arm/static/src/**/*',
+        ],
+    },
     'test': [
         'tests/test_workplace.py',
         'tests/test_workplace_task.py',
+        'tests/test_claim_concurrency.py',
+        'tests/test_performance.py',
     ],
     'demo': [],
     'installable': True,
@@ -0,0 +1,60 @@
+import hashlib
+import json
+
+from odoo import http, _
+from odoo.http import request
+
+
+class WorkplaceTerminalController(http.Controller):
+    # Compact API for ARM terminals: list what the operator can start now,
+    # run task actions and replay operations queued while offline, without
+    # loading the task kanban.
+
+    MAX_PAGE_SIZE = 200
+
+    MAX_SYNC_BATCH = 500
+
+    @http.route('/workplace_arm/api/workplaces/<int:workplace_id>/tasks', type='http', auth='user',
+                methods=['GET'])
+    def claimable_tasks(self, workplace_id, limit=50, cursor=None, **kwargs):
+        WorkTask = request.env['workplace.task']
+        limit = max(1, min(int(limit), self.MAX_PAGE_SIZE))
+        tasks = WorkTask._get_claimable_tasks(workplace_id, limit=limit, cursor=cursor or None)
+        payload = {
+            'workplace_id': workplace_id,
+            'tasks': tasks,
+            'next_cursor': WorkTask._encode_cursor(tasks[-1]['order_date'], tasks[-1]['id'])
+                           if len(tasks) == limit else None,
+        }
+        body = json.dumps(payload, separators=(',', ':'))
+        etag = '"%s"' % hashlib.sha1(('%s:%s' % (request.env.uid, body)).encode()).hexdigest()
+        headers = [('ETag', etag), ('Cache-Control', 'private, no-cache')]
+        if etag in request.httprequest.headers.get('If-None-Match', ''):
+            return request.make_response('', headers=headers, status=304)
+        return request.make_response(body, headers=headers + [('Content-Type', 'application/json')])
+
+    @http.route('/workplace_arm/api/tasks/<int:task_id>/<string:action>', type='json', auth='user',
+                methods=['POST'])
+    def task_action(self, task_id, action, reason=None, **kwargs):
+        # Single calls are not a terminal session: they do not count as a
+        # heartbeat, so such clients are never reaped.
+        return request.env['workplace.task']._apply_terminal_operations([{
+            'task_id': task_id,
+            'action': action,
+            'reason': reason,
+        }], heartbeat=False)[0]
+
+    @http.route('/workplace_arm/api/sync', type='json', auth='user', methods=['POST'])
+    def sync(self, operations, **kwargs):
+        if len(operations) > self.MAX_SYNC_BATCH:
+            return {'error': _('At most %s operations per batch.', self.MAX_SYNC_BATCH)}
+        return {'results': request.env['workplace.task']._apply_terminal_operations(operations)}
+
+    @http.route('/workplace_arm/api/scan', type='json', auth='user', methods=['POST'])
+    def scan_to_claim(self, code, uuid=None, **kwargs):
+        # Traveler sheet scanned at the terminal: resolve and claim in one call.
+        return request.env['workplace.task']._scan_to_claim(code, uuid=uuid)
+
+    @http.route('/workplace_arm/api/heartbeat', type='json', auth='user', methods=['POST'])
+    def heartbeat(self, **kwargs):
+        return {'ok': True, 'workplaces': request.env['workplace.operator.load']._heartbeat()}
@@ -0,0 +1,16 @@
+def migrate(cr, version):
+    if not version:
+        return
+    # color became stored: fill it in SQL so the upgrade does not recompute
+    # every task in Python.
+    cr.execute("ALTER TABLE workplace_task ADD COLUMN IF NOT EXISTS color integer")
+    cr.execute("""
+        UPDATE workplace_task
+           SET color = CASE status
+                           WHEN 'ready' THEN 0
+                           WHEN 'in_progress' THEN 1
+                           WHEN 'completed' THEN 10
+                           WHEN 'defect' THEN 2
+                           ELSE 3
+                       END
+    """)
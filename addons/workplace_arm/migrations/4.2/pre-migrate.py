@@ -0,0 +1,11 @@
+def migrate(cr, version):
+    if not version:
+        return
+    # order_date became required and is the default order of tasks. Values
+    # are whole seconds, like the ones the ORM writes, so paging cursors built
+    # from them match the stored value.
+    cr.execute("""
+        UPDATE workplace_task
+           SET order_date = date_trunc('second', COALESCE(create_date, now() at time zone 'UTC'))
+         WHERE order_date IS NULL
+    """)
@@ -0,0 +1,11 @@
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    if not version:
+        return
+    # equipment_down is new: derive it once from the open maintenance requests.
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env['workplace.workplace'].with_context(active_test=False).search([
+        ('equipment_ids', '!=', False),
+    ])._refresh_equipment_down()
@@ -0,0 +1,11 @@
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    if not version:
+        return
+    # Load counters are only kept up to date by task actions: seed them from
+    # the current operators, or completing one task would take an operator
+    # off a workplace where they still have another task in progress.
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env['workplace.operator.load']._rebuild()
@@ -0,0 +1,7 @@
+def migrate(cr, version):
+    if not version:
+        return
+    # The trigram indexes are now declared on the fields; drop the ones the
+    # module used to create by hand.
+    cr.execute("DROP INDEX IF EXISTS workplace_task_name_trgm_idx")
+    cr.execute("DROP INDEX IF EXISTS workplace_task_customer_order_number_trgm_idx")
@@ -1,5 +1,10 @@
 from . import workplace
 from . import mrp_production
-
-
-
+from . import maintenance_request
+from . import workplace_operator_load
+from . import workplace_task_history
+from . import workplace_task_event
+from . import workplace_stats
+from . import workplace_dispatcher
+from . import workplace_action_stat
+from . import workplace_job
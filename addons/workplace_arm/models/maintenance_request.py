@@ -0,0 +1,24 @@
+from odoo import models, api
+
+
+class MaintenanceRequest(models.Model):
+    _inherit = 'maintenance.request'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        requests = super().create(vals_list)
+        self.env['workplace.workplace']._recompute_equipment_down(requests.equipment_id)
+        return requests
+
+    def write(self, vals):
+        equipment = self.equipment_id if 'equipment_id' in vals else self.env['maintenance.equipment']
+        res = super().write(vals)
+        if any(field in vals for field in ('stage_id', 'equipment_id', 'archive')):
+            self.env['workplace.workplace']._recompute_equipment_down(equipment | self.equipment_id)
+        return res
+
+    def unlink(self):
+        equipment = self.equipment_id
+        res = super().unlink()
+        self.env['workplace.workplace']._recompute_equipment_down(equipment)
+        return res
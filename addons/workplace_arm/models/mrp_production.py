@@ -5,3 +5,9 @@ class MrpProduction(models.Model):
     _inherit = 'mrp.production'
 
     workplace_id = fields.Many2one('workplace.workplace', string='Workplace')
+    workplace_task_ids = fields.One2many('workplace.task', 'production_id', string='Work Tasks')
+    workplace_task_history_ids = fields.One2many('workplace.task.history', 'production_id', string='Archived Work Tasks')
+
+    def action_generate_workplace_tasks(self):
+        productions = self.filtered(lambda p: p.workplace_id and p.state not in ('done', 'cancel'))
+        self.env['workplace.task']._create_from_productions(productions)
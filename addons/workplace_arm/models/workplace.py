@@ -1,5 +1,16 @@
-from odoo import models, fields, api, _
-from odoo.exceptions import ValidationError, AccessError
+import logging
+import threading
+from collections import Counter, defaultdict
+
+
+from odoo import models, fields, api, tools, _
+from odoo.exceptions import ValidationError, AccessError, UserError
+from odoo.tools import split_every
+from odoo.tools.sql import create_index
+
+from .workplace_action_stat import instrumented, lock_timer
+
+_logger = logging.getLogger(__name__)
 
 
 class Workplace(models.Model):
@@ -8,6 +19,9 @@ class Workplace(models.Model):
     _rec_name = 'name'
     _order = 'name'
 
+    CLAIMABLE_STATUSES = ('available', 'occupied')
+    CLAIM_CACHE_FIELDS = ('capacity', 'status', 'active', 'equipment_down')
+
     name = fields.Char('Workplace Name', required=True)
     code = fields.Char('Workplace Code', required=True)
     description = fields.Text('Description')
@@ -23,6 +37,8 @@ class Workplace(models.Model):
 
     manufacturing_order_ids = fields.One2many('mrp.production', 'workplace_id', 'Manufacturing Orders')
     equipment_ids = fields.Many2many('maintenance.equipment', 'Equipment')
+    equipment_down = fields.Boolean('Equipment Down', readonly=True, copy=False,
+                                    help='Some linked equipment has an open maintenance request')
     task_ids = fields.One2many('workplace.task', 'workplace_id', 'Tasks')
 
     operator_ids = fields.Many2many('res.users', 'workplace_operator_rel', 
@@ -31,29 +47,113 @@ class Workplace(models.Model):
     current_operator_ids = fields.Many2many('res.users', 'workplace_current_operator_rel',
                                            string='Current Operators',
                                            help='Users currently working on this workplace')
+    occupancy = fields.Integer('Occupancy', compute='_compute_occupancy', store=True, index=True,
+                               help='Number of users currently working on this workplace')
 
     notes = fields.Text('Notes')
 
+    _sql_constraints = [
+        ('code_unique', 'unique(code)', 'Workplace code must be unique.'),
+    ]
+
+    @api.depends('current_operator_ids')
+    def _compute_occupancy(self):
+        for record in self:
+            record.occupancy = len(record.current_operator_ids)
+
     @api.constrains('capacity')
     def _check_capacity(self):
         for record in self:
             if record.capacity <= 0:
                 raise ValidationError(_('Capacity must be greater than 0.'))
 
-    @api.constrains('code')
-    def _check_code_unique(self):
-        for record in self:
-            if record.code:
-                duplicate = self.search([('code', '=', record.code), ('id', '!=', record.id)])
-                if duplicate:
-                    raise ValidationError(_('Workplace code must be unique.'))
-
     @api.constrains('current_operator_ids', 'capacity')
     def _check_current_operator_capacity(self):
         for record in self:
-            if len(record.current_operator_ids) > record.capacity:
+            if record.occupancy > record.capacity:
                 raise ValidationError(_('Number of current operators cannot exceed workplace capacity.'))
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        workplaces = super().create(vals_list)
+        workplaces.filtered('equipment_ids')._refresh_equipment_down()
+        return workplaces
+
+    def write(self, vals):
+        # The claim cache is cleared only when a cached value really changes:
+        # clearing it drops every ormcache of the registry, on all workers.
+        claim_fields = [field for field in self.CLAIM_CACHE_FIELDS if field in vals]
+        before = {workplace.id: [workplace[field] for field in claim_fields] for workplace in self} if claim_fields else {}
+        res = super().write(vals)
+        if 'equipment_ids' in vals:
+            self._refresh_equipment_down()
+        if any(values != [self.browse(workplace_id)[field] for field in claim_fields]
+               for workplace_id, values in before.items()):
+            self.env.registry.clear_cache()
+        return res
+
+    @api.model
+    def _recompute_equipment_down(self, equipment):
+        # Called when maintenance requests change: one search for the linked
+        # workplaces, then one bulk refresh, whatever the number of machines.
+        if equipment:
+            self.sudo().with_context(active_test=False).search([
+                ('equipment_ids', 'in', equipment.ids),
+            ])._refresh_equipment_down()
+
+    def _refresh_equipment_down(self):
+        # A workplace is down while any of its equipment has an open request.
+        if not self:
+            return
+        groups = self.env['maintenance.request'].sudo()._read_group([
+            ('equipment_id', 'in', self.equipment_ids.ids),
+            ('stage_id.done', '=', False),
+            ('archive', '=', False),
+        ], ['equipment_id'])
+        down_equipment = {equipment.id for equipment, in groups}
+        down = self.filtered(lambda workplace: not down_equipment.isdisjoint(workplace.equipment_ids.ids))
+        down.filtered(lambda workplace: not workplace.equipment_down).write({'equipment_down': True})
+        (self - down).filtered('equipment_down').write({'equipment_down': False})
+
+    @api.model
+    @tools.ormcache('workplace_id')
+    def _get_claim_info(self, workplace_id):
+        # Per-worker read-through cache of (capacity, status, active,
+        # equipment_down): these rarely change while tasks are claimed all the
+        # time. write() clears it, which the registry signals to the other
+        # workers on commit.
+        self.flush_model(self.CLAIM_CACHE_FIELDS)
+        self.env.cr.execute("""
+            SELECT capacity, status, active, equipment_down IS TRUE FROM workplace_workplace WHERE id = %s
+        """, [workplace_id])
+        return self.env.cr.fetchone() or (0, 'inactive', False, False)
+
+    def _check_claimable(self):
+        # Cheap pre-check from the cache; _lock_for_claim re-checks under lock.
+        for workplace_id in self.ids:
+            _capacity, status, active, equipment_down = self._get_claim_info(workplace_id)
+            if not active or status not in self.CLAIMABLE_STATUSES:
+                raise ValidationError(_('Workplace %s is not available for work.', self.browse(workplace_id).display_name))
+            if equipment_down:
+                raise ValidationError(_('Equipment of workplace %s is under maintenance.',
+                                        self.browse(workplace_id).display_name))
+
+    def _lock_for_claim(self):
+        # Locked in id order so concurrent multi-workplace claims cannot deadlock.
+        if not self:
+            return {}
+        self.flush_model(['capacity', 'occupancy', 'status', 'active', 'equipment_down'])
+        with lock_timer():
+            self.env.cr.execute("""
+                SELECT id, capacity, occupancy, active AND status IN %s AND equipment_down IS NOT TRUE
+                  FROM workplace_workplace
+                 WHERE id IN %s
+                 ORDER BY id
+                   FOR NO KEY UPDATE
+            """, [self.CLAIMABLE_STATUSES, tuple(self.ids)])
+        self.invalidate_recordset(['capacity', 'occupancy', 'current_operator_ids'])
+        return {wid: (capacity, occupancy, claimable) for wid, capacity, occupancy, claimable in self.env.cr.fetchall()}
+
     def action_set_available(self):
         self.write({'status': 'available'})
 
@@ -72,18 +172,28 @@ class WorkTask(models.Model):
     _name = 'workplace.task'
     _description = 'Work Task'
     _rec_name = 'name'
-    _order = 'name'
+    _order = 'order_date, id'
     
     STATUS_READY = 'ready'
     STATUS_IN_PROGRESS = 'in_progress'
     STATUS_COMPLETED = 'completed'
     STATUS_DEFECT = 'defect'
     STATUS_CANCELLED = 'cancelled'
+    TERMINAL_STATUSES = (STATUS_COMPLETED, STATUS_DEFECT, STATUS_CANCELLED)
+    FINISH_CHUNK_SIZE = 500
+    SCAN_CODE_PREFIX = 'WT'
+    STATUS_COLORS = {
+        STATUS_READY: 0,
+        STATUS_IN_PROGRESS: 1,
+        STATUS_COMPLETED: 10,
+        STATUS_DEFECT: 2,
+        STATUS_CANCELLED: 3,
+    }
     
     
     
 
-    name = fields.Char('Task Name', required=True)
+    name = fields.Char('Task Name', required=True, index='trigram')
     workplace_id = fields.Many2one('workplace.workplace', string='Workplace')
     operator_ids = fields.Many2many('res.users', 'workplace_task_operator_rel', 
                                    string='Operators')
@@ -91,9 +201,15 @@ class WorkTask(models.Model):
                                            string='Current Operators')
     allowed_operators = fields.Many2many('res.users', 'workplace_task_allowed_operator_rel',
                                         string='Allowed Operators', required=True)
+    proposed_user_id = fields.Many2one('res.users', string='Proposed Operator', readonly=True, copy=False,
+                                       index='btree_not_null',
+                                       help='Operator suggested by the dispatcher for this ready task')
     
-    customer_order_number = fields.Char('Customer Order Number')
-    order_date = fields.Datetime('Order Date', default=lambda self: fields.Datetime.now())
+    production_id = fields.Many2one('mrp.production', string='Manufacturing Order', index=True, copy=False)
+    customer_order_number = fields.Char('Customer Order Number', index='trigram')
+    scan_code = fields.Char('Scan Code', readonly=True, copy=False,
+                            help='Code printed on the traveler sheet; scanning it claims the task')
+    order_date = fields.Datetime('Order Date', required=True, default=lambda self: fields.Datetime.now())
     
     status = fields.Selection([  # pyright: ignore[reportArgumentType]
         ('ready', 'Ready to Work'),
@@ -101,77 +217,299 @@ class WorkTask(models.Model):
         ('completed', 'Completed'),
         ('defect', 'Defect'),
         ('cancelled', 'Cancelled')
-    ], default=STATUS_READY, required=True)
+    ], default=STATUS_READY, required=True, group_expand='_group_expand_status')
+    date_done = fields.Datetime('Finished On', readonly=True, copy=False, index=True)
     
-    color = fields.Integer('Color', compute='_compute_color')
+    color = fields.Integer('Color', compute='_compute_color', store=True)
     
     @api.depends('status')
     def _compute_color(self):
+        colors = self.STATUS_COLORS
         for record in self:
-            if record.status == self.STATUS_READY:
-                record.color = 0  
-            elif record.status == self.STATUS_IN_PROGRESS:
-                record.color = 1 
-            elif record.status == self.STATUS_COMPLETED:
-                record.color = 10  
-            elif record.status == self.STATUS_DEFECT:
-                record.color = 2  
-            else:
-                record.color = 3
+            record.color = colors.get(record.status, 3)
 
     defect_reason = fields.Text('Defect Reason')
     notes = fields.Text('Notes')
+    event_ids = fields.One2many('workplace.task.event', 'task_id', string='Events')
 
+    _sql_constraints = [
+        ('production_uniq', 'unique(production_id)', 'A manufacturing order can only generate one work task.'),
+        ('scan_code_uniq', 'unique(scan_code)', 'The scan code must be unique.'),
+    ]
+
+    def init(self):
+        self.env.cr.execute("CREATE SEQUENCE IF NOT EXISTS workplace_task_scan_code_seq")
+        self.env.cr.execute("""
+            UPDATE workplace_task
+               SET scan_code = %s || lpad(nextval('workplace_task_scan_code_seq')::text, 8, '0')
+             WHERE scan_code IS NULL
+        """, [self.SCAN_CODE_PREFIX])
+        create_index(self.env.cr, 'workplace_task_status_workplace_id_idx', self._table, ['status', 'workplace_id'])
+        # Working set of the terminals: ready tasks per workplace, oldest first.
+        create_index(self.env.cr, 'workplace_task_ready_workplace_idx', self._table,
+                     ['workplace_id', 'order_date', 'id'], where="status = 'ready'")
+        # Default order, overall (list) and within a status column (kanban).
+        create_index(self.env.cr, 'workplace_task_order_date_id_idx', self._table, ['order_date', 'id'])
+        create_index(self.env.cr, 'workplace_task_status_order_date_id_idx', self._table,
+                     ['status', 'order_date', 'id'])
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        for vals in vals_list:
+            if vals.get('status') in self.TERMINAL_STATUSES and not vals.get('date_done'):
+                vals['date_done'] = fields.Datetime.now()
+        missing = [vals for vals in vals_list if not vals.get('scan_code')]
+        if missing:
+            # One round trip for the whole batch.
+            self.env.cr.execute("""
+                SELECT nextval('workplace_task_scan_code_seq') FROM generate_series(1, %s)
+            """, [len(missing)])
+            for vals, (number,) in zip(missing, self.env.cr.fetchall()):
+                vals['scan_code'] = '%s%08d' % (self.SCAN_CODE_PREFIX, number)
+        return super().create(vals_list)
+
+    def write(self, vals):
+        if 'status' in vals and 'date_done' not in vals:
+            vals = dict(vals, date_done=fields.Datetime.now() if vals['status'] in self.TERMINAL_STATUSES else False)
+        return super().write(vals)
+
+    @api.model
+    def _board_channel(self, workplace_id):
+        return 'workplace_arm_workplace_%s' % workplace_id
+
+    def _notify_board_changes(self):
+        # One small diff per workplace channel; terminals patch their cards
+        # in place instead of reloading the board.
+        for workplace, tasks in self.grouped('workplace_id').items():
+            if not workplace:
+                continue
+            self.env['bus.bus']._sendone(self._board_channel(workplace.id), 'workplace_arm/task_update', {
+                'workplace_id': workplace.id,
+                'tasks': tasks._terminal_payload(),
+            })
+
+    def _filter_allowed_for(self, user):
+        # Index-only lookup on the (user, task) index of the relation table
+        # instead of loading every task's allowed_operators.
+        if not self:
+            return self
+        self.flush_recordset(['allowed_operators'])
+        self.env.cr.execute("""
+            SELECT workplace_task_id FROM workplace_task_allowed_operator_rel
+             WHERE res_users_id = %s AND workplace_task_id IN %s
+        """, [user.id, tuple(self.ids)])
+        allowed_ids = {task_id for task_id, in self.env.cr.fetchall()}
+        return self.filtered(lambda task: task.id in allowed_ids)
+
+    def _lock_for_claim(self):
+        self.flush_recordset()
+        with lock_timer():
+            self.env.cr.execute("""
+                SELECT id, status FROM workplace_task
+                 WHERE id IN %s
+                 ORDER BY id
+                   FOR NO KEY UPDATE SKIP LOCKED
+            """, [tuple(self.ids)])
+        rows = self.env.cr.fetchall()
+        if len(rows) != len(self):
+            raise ValidationError(_('This task is being claimed by another operator. Please try again.'))
+        # Re-checked under the lock: the task may have been finished meanwhile.
+        if any(status in self.TERMINAL_STATUSES for _task_id, status in rows):
+            raise ValidationError(_('This task is already finished.'))
+
+    @instrumented('start_work')
     def action_start_work(self):
-        if not self.workplace_id:
+        if not self:
+            return
+        if any(not task.workplace_id for task in self):
             raise ValidationError(_('Workplace is required to start work.'))
+        if any(task.status in self.TERMINAL_STATUSES for task in self):
+            raise ValidationError(_('This task is already finished.'))
         
-        if not self.allowed_operators or self.env.user not in self.allowed_operators:
+        self.workplace_id._check_claimable()  # pyright: ignore[reportAttributeAccessIssue]
+        user = self.env.user
+        if self._filter_allowed_for(user) != self:
             raise ValidationError(_('You are not allowed to work on this task.'))
         
-        if len(self.workplace_id.current_operator_ids) >= self.workplace_id.capacity:  # pyright: ignore[reportAttributeAccessIssue]
-            raise ValidationError(_('Workplace capacity is full. Cannot start work.'))
+        # The capacity check and the writes below must see the same state:
+        # lock the tasks (skip if someone else is claiming them) and then the
+        # workplace rows, and count the operators under that lock.
+        self._lock_for_claim()
+        workplaces = self.workplace_id
+        for capacity, occupancy, claimable in workplaces._lock_for_claim().values():  # pyright: ignore[reportAttributeAccessIssue]
+            if not claimable:
+                raise ValidationError(_('Workplace is not available for work.'))
+            if occupancy >= capacity:
+                raise ValidationError(_('Workplace capacity is full. Cannot start work.'))
         
-        self.workplace_id.write({'current_operator_ids': [(4, self.env.user.id)]})  # pyright: ignore[reportAttributeAccessIssue]
+        workplaces.write({'current_operator_ids': [(4, user.id)]})  # pyright: ignore[reportAttributeAccessIssue]
+        self.env['workplace.operator.load']._apply_deltas(Counter(
+            (task.workplace_id.id, user.id) for task in self if user not in task.current_operator_ids  # pyright: ignore[reportAttributeAccessIssue]
+        ))
         
         self.write({
-            'status': 'in_progress',
-            'operator_ids': [(4, self.env.user.id)],
-            'current_operator_ids': [(4, self.env.user.id)] 
+            'status': self.STATUS_IN_PROGRESS,
+            'proposed_user_id': False,
+            'operator_ids': [(4, user.id)],
+            'current_operator_ids': [(4, user.id)]
         })
+        self.env['workplace.task.event']._log(self, 'start')
+        self._notify_board_changes()
 
     def _clear_all_operators(self):
-        workplace = self.workplace_id
-        if workplace:
-            workplace.write({'current_operator_ids': [(3, op.id) for op in self.current_operator_ids]})  # pyright: ignore[reportAttributeAccessIssue]
+        deltas = Counter()
+        for task in self.filtered('workplace_id'):
+            for op_id in task.current_operator_ids.ids:
+                deltas[(task.workplace_id.id, op_id)] -= 1  # pyright: ignore[reportAttributeAccessIssue]
+        load = self.env['workplace.operator.load']._apply_deltas(deltas)
+        self._leave_idle_workplaces(deltas, load)
         self.write({'current_operator_ids': [(5, 0, 0)]})
 
+    @api.model
+    def _leave_idle_workplaces(self, deltas, load):
+        # Operators leave a workplace once they have no other task there.
+        idle = defaultdict(list)
+        for (workplace_id, op_id) in deltas:
+            if load.get((workplace_id, op_id), 0) <= 0:
+                idle[workplace_id].append(op_id)
+        if idle:
+            # One statement for every affected workplace instead of a write each.
+            Workplace = self.env['workplace.workplace']
+            Workplace.flush_model(['current_operator_ids'])
+            pairs = [(workplace_id, op_id) for workplace_id, op_ids in idle.items() for op_id in op_ids]
+            self.env.cr.execute("""
+                DELETE FROM workplace_current_operator_rel r
+                 USING unnest(%s::int[], %s::int[]) AS d(workplace_id, user_id)
+                 WHERE r.workplace_workplace_id = d.workplace_id AND r.res_users_id = d.user_id
+            """, [[workplace_id for workplace_id, _op_id in pairs], [op_id for _workplace_id, op_id in pairs]])
+            workplaces = Workplace.browse(list(idle))
+            workplaces.invalidate_recordset(['current_operator_ids'])
+            workplaces.modified(['current_operator_ids'])
+
+    def _check_can_finish(self, status):
+        if any(task.status in self.TERMINAL_STATUSES for task in self):
+            raise ValidationError(_('Some of the selected tasks are already finished.'))
+        if status == self.STATUS_CANCELLED and not self.env.user.has_group('base.group_system'):
+            # Same rules as action_cancel, for every selected task.
+            user = self.env.user
+            if any(task.status != self.STATUS_IN_PROGRESS or user not in task.current_operator_ids for task in self):
+                raise ValidationError(_('You can only cancel tasks in progress that you are working on.'))
+
+    def _lock_for_finish(self):
+        # Finished state is re-checked under the row lock, so a task finished
+        # concurrently is not finished (and booked into the stats) twice.
+        self.flush_recordset(['status'])
+        with lock_timer():
+            self.env.cr.execute("""
+                SELECT id FROM workplace_task
+                 WHERE id IN %s AND status NOT IN %s
+                 ORDER BY id
+                   FOR NO KEY UPDATE
+            """, [tuple(self.ids), self.TERMINAL_STATUSES])
+        if self.env.cr.rowcount != len(self):
+            raise ValidationError(_('Some of the selected tasks are already finished.'))
+
+    def _finish_chunk(self, status, reason, vals=None):
+        self._lock_for_finish()
+        self.write(dict(vals or {}, status=status))
+        self._clear_all_operators()
+        self.env['workplace.task.event']._log(self, 'defect' if status == self.STATUS_DEFECT else 'cancel', reason)
+        self._notify_board_changes()
+        # Everything else runs out of the request, from the job queue.
+        self.env['workplace.job']._enqueue(
+            self, '_job_after_finish', fields.Datetime.to_string(fields.Datetime.now()),
+            description=_('Follow-up of %(count)s %(status)s tasks', count=len(self), status=status),
+        )
+
+    def _finish_with_reason(self, status, reason, vals=None):
+        # Defect/cancel for any number of tasks with one reason. Returns the
+        # tasks that could not be finished.
+        #
+        # Up to FINISH_CHUNK_SIZE tasks this is all or nothing. Larger
+        # selections are committed chunk by chunk: a chunk that fails is
+        # rolled back to its savepoint and reported, while the chunks before
+        # and after it stay committed.
+        self._check_can_finish(status)
+        if len(self) <= self.FINISH_CHUNK_SIZE:
+            self._finish_chunk(status, reason, vals)
+            return self.browse()
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        failed = self.browse()
+        for tasks in split_every(self.FINISH_CHUNK_SIZE, self.ids, self.browse):
+            try:
+                with self.env.cr.savepoint():
+                    tasks._finish_chunk(status, reason, vals)
+            except UserError as e:
+                self.env.invalidate_all()
+                failed |= tasks
+                _logger.warning("Could not set %s tasks to %s: %s", len(tasks), status, e)
+                continue
+            if auto_commit:
+                self.env.cr.commit()
+        return failed
+
+    def _job_after_finish(self, date_done):
+        self.env['workplace.stats']._record_outcomes(self, fields.Datetime.to_datetime(date_done))
+        defects = self.filtered(lambda task: task.status == self.STATUS_DEFECT)
+        if defects and self.env['ir.config_parameter'].sudo().get_param('workplace_arm.defect_opens_maintenance'):
+            defects._open_maintenance_requests()
+
+    def _open_maintenance_requests(self):
+        # One request per piece of equipment of the affected workplaces,
+        # unless it already has an open one.
+        equipment_tasks = defaultdict(lambda: self.browse())
+        for task in self:
+            for equipment in task.workplace_id.equipment_ids:  # pyright: ignore[reportAttributeAccessIssue]
+                equipment_tasks[equipment] |= task
+        if not equipment_tasks:
+            return
+        Request = self.env['maintenance.request'].sudo()
+        busy = Request.search([
+            ('equipment_id', 'in', [equipment.id for equipment in equipment_tasks]),
+            ('stage_id.done', '=', False),
+        ]).equipment_id
+        Request.create([{
+            'name': _('Defects at %s', tasks.workplace_id[:1].name),
+            'equipment_id': equipment.id,
+            'description': '\n'.join('%s: %s' % (task.name, task.defect_reason or '') for task in tasks),
+        } for equipment, tasks in equipment_tasks.items() if equipment not in busy])
+
+    @instrumented('complete')
     def action_complete(self):
+        if not self:
+            return
+        # Every task is unfinished under the lock, so each one is booked into
+        # the statistics once, by the call that actually completes it.
+        self._lock_for_finish()
         self.write({'status': self.STATUS_COMPLETED})
         self._clear_all_operators()
+        self.env['workplace.task.event']._log(self, 'complete')
+        self.env['workplace.stats']._record_outcomes(self)
+        self._notify_board_changes()
     
+    @instrumented('remove_operator')
     def action_remove_operator(self):
-        if self.env.user not in self.current_operator_ids:
+        user = self.env.user
+        if not self or any(user not in task.current_operator_ids for task in self):
             raise ValidationError(_('You are not currently working on this task.'))
         
-        self.write({'current_operator_ids': [(3, self.env.user.id)]})
-        
-        workplace = self.workplace_id
-        other_active_tasks = self.env['workplace.task'].search([
-            ('workplace_id', '=', workplace.id),  # pyright: ignore[reportAttributeAccessIssue]
-            ('current_operator_ids', 'in', self.env.user.id),
-            ('status', '=', self.STATUS_IN_PROGRESS),
-            ('id', '!=', self.id)
-        ])
-        
-        if not other_active_tasks:
-            workplace.write({'current_operator_ids': [(3, self.env.user.id)]})  # pyright: ignore[reportAttributeAccessIssue]
+        self._detach_operator(user)
+
+    def _detach_operator(self, user):
+        self.write({'current_operator_ids': [(3, user.id)]})
         
-        return {
-            'type': 'ir.actions.client',
-            'tag': 'reload',
-        }
+        # Leave a workplace only if none of the user's other tasks there is
+        # still active; the load counters answer that without a search.
+        deltas = Counter()
+        for task in self.filtered('workplace_id'):
+            deltas[(task.workplace_id.id, user.id)] -= 1  # pyright: ignore[reportAttributeAccessIssue]
+        load = self.env['workplace.operator.load']._apply_deltas(deltas)
+        idle_workplaces = self.workplace_id.filtered(lambda w: load.get((w.id, user.id), 0) <= 0)
+        idle_workplaces.write({'current_operator_ids': [(3, user.id)]})  # pyright: ignore[reportAttributeAccessIssue]
+        self.env['workplace.task.event']._log(self, 'leave', user=user)
+        self._notify_board_changes()
 
+    @instrumented('defect')
     def action_defect(self):
         return {
             'type': 'ir.actions.act_window',
@@ -179,9 +517,10 @@ class WorkTask(models.Model):
             'res_model': 'workplace.defect.wizard',
             'view_mode': 'form',
             'target': 'new',
-            'context': {'active_id': self.id}
+            'context': {'active_id': self.id, 'active_ids': self.ids}
         }
 
+    @instrumented('cancel')
     def action_cancel(self):
         if self.status != self.STATUS_IN_PROGRESS:
             raise ValidationError(_('Task is not in progress. Cannot cancel.'))
@@ -195,28 +534,263 @@ class WorkTask(models.Model):
             'res_model': 'workplace.cancel.wizard',
             'view_mode': 'form',
             'target': 'new',
-            'context': {'active_id': self.id}
+            'context': {'active_id': self.id, 'active_ids': self.ids}
         }
     
     
+    @api.model
+    def _group_expand_status(self, statuses, domain):
+        return [key for key, _label in type(self).status.selection]
+
+    @api.model
+    def _board_history_domain(self):
+        # Finished columns of the status board only show recent tasks when
+        # workplace_arm.board_history_days is set; the live columns are never cut.
+        days = int(self.env['ir.config_parameter'].sudo().get_param('workplace_arm.board_history_days', 0))
+        if days <= 0:
+            return []
+        return ['|', ('status', 'not in', self.TERMINAL_STATUSES),
+                ('date_done', '>=', fields.Datetime.subtract(fields.Datetime.now(), days=days))]
+
     @api.model
     def read_group(self, domain, fields, groupby, offset=0, limit=None, orderby=False, lazy=True):
         if groupby and groupby[0] == 'status':
-            result = super().read_group(domain, fields, groupby, offset, limit, orderby, lazy)
-            
-            all_statuses = [self.STATUS_READY, self.STATUS_IN_PROGRESS, self.STATUS_COMPLETED, self.STATUS_DEFECT, self.STATUS_CANCELLED]
-            existing_statuses = {group['status'] for group in result if 'status' in group}
-            
-            for status in all_statuses:
-                if status not in existing_statuses:
-                    result.append({
-                        'status': status,
-                        'status_count': 0,
-                        '__domain': domain + [('status', '=', status)]
-                    })
-            
-            result.sort(key=lambda x: all_statuses.index(x['status']))
-            return result
-        
+            domain = list(domain or []) + self._board_history_domain()
         return super().read_group(domain, fields, groupby, offset, limit, orderby, lazy)
-    
+
+    @api.model
+    def _encode_cursor(self, order_date, task_id):
+        return '%s,%s' % (order_date, task_id)
+
+    @api.model
+    def _decode_cursor(self, cursor):
+        order_date, task_id = cursor.rsplit(',', 1)
+        return fields.Datetime.to_datetime(order_date), int(task_id)
+
+    @api.model
+    def _get_claimable_tasks(self, workplace_id, limit=50, cursor=None):
+        # Terminal listing: ready tasks of one workplace the current user may
+        # start, read in one indexed query without loading the ORM records.
+        # Pages are keyset cursors on (order_date, id), so any page costs an
+        # index range scan of `limit` rows.
+        self.check_access('read')
+        after = self._decode_cursor(cursor) if cursor else (None, 0)
+        self.flush_model(['name', 'workplace_id', 'status', 'customer_order_number', 'order_date', 'allowed_operators'])
+        self.env.cr.execute("""
+            SELECT t.id, t.name, t.customer_order_number, t.order_date, t.write_date
+              FROM workplace_task t
+              JOIN workplace_task_allowed_operator_rel a
+                ON a.workplace_task_id = t.id AND a.res_users_id = %s
+             WHERE t.workplace_id = %s AND t.status = %s
+               AND (%s::timestamp IS NULL OR (t.order_date, t.id) > (%s, %s))
+             ORDER BY t.order_date, t.id
+             LIMIT %s
+        """, [self.env.uid, workplace_id, self.STATUS_READY, after[0], after[0], after[1], limit])
+        return [{
+            'id': task_id,
+            'name': name,
+            'customer_order_number': customer_order_number or '',
+            'order_date': fields.Datetime.to_string(order_date),
+            'write_date': fields.Datetime.to_string(write_date),
+        } for task_id, name, customer_order_number, order_date, write_date in self.env.cr.fetchall()]
+
+    def _terminal_payload(self):
+        return [{
+            'id': task.id,
+            'status': task.status,
+            'current_operator_ids': task.current_operator_ids.ids,
+        } for task in self]
+
+    @api.model
+    def _find_by_scan_code(self, code):
+        return self.search([('scan_code', '=', (code or '').strip().upper())], limit=1)
+
+    @api.model
+    def _scan_to_claim(self, code, uuid=None):
+        task = self._find_by_scan_code(code)
+        if not task:
+            return {'uuid': uuid, 'status': 'error', 'message': _('No task with code %s.', code)}
+        # Only a waiting task can be started from its sheet; an old sheet of a
+        # task that is running or finished must not put the operator on it.
+        # A re-sent scan that was already applied still answers as a duplicate.
+        already_applied = uuid and self.env['workplace.task.event'].search_count([('client_uuid', '=', uuid)], limit=1)
+        if task.status != self.STATUS_READY and not already_applied:
+            return {
+                'uuid': uuid,
+                'task_id': task.id,
+                'action': 'claim',
+                'name': task.name,
+                'status': 'conflict',
+                'message': _('Task %s is not ready to start.', task.name),
+            }
+        result = self._apply_terminal_operations([{'uuid': uuid, 'task_id': task.id, 'action': 'claim'}])[0]
+        result['name'] = task.name
+        return result
+
+    def _run_terminal_action(self, action, reason=False):
+        self.ensure_one()
+        if action == 'claim':
+            self.action_start_work()
+        elif action == 'complete':
+            self.action_complete()
+        elif action == 'leave':
+            self.action_remove_operator()
+        elif action in ('defect', 'cancel'):
+            if not (reason or '').strip():
+                raise ValidationError(_('A reason is required.'))
+            if action == 'defect':
+                self.env['workplace.defect.wizard'].create({
+                    'task_ids': self.ids,
+                    'defect_reason': reason,
+                }).action_confirm_defect()
+            else:
+                self.action_cancel()
+                self.env['workplace.cancel.wizard'].create({
+                    'task_ids': self.ids,
+                    'cancel_reason': reason,
+                }).action_confirm_cancel()
+        else:
+            raise ValidationError(_('Unknown action: %s', action))
+
+    @api.model
+    def _apply_terminal_operations(self, operations, heartbeat=True):
+        # Replays operations queued by a terminal, in order. Each one runs in
+        # its own savepoint so a conflict (task taken, capacity full) only
+        # rejects that item. Operations carry a client uuid stamped on their
+        # event, which makes a re-sent batch a no-op.
+        uuids = [op['uuid'] for op in operations if op.get('uuid')]
+        applied = set()
+        if uuids:
+            applied = set(self.env['workplace.task.event'].search([('client_uuid', 'in', uuids)]).mapped('client_uuid'))
+        results = []
+        for op in operations:
+            uuid = op.get('uuid')
+            result = {'uuid': uuid, 'task_id': op.get('task_id'), 'action': op.get('action')}
+            results.append(result)
+            if uuid and uuid in applied:
+                result.update(status='ok', duplicate=True)
+                continue
+            if op.get('uid') and op['uid'] != self.env.uid:
+                # Queued by another operator of a shared terminal.
+                result.update(status='error', message=_('This operation was recorded by another user.'))
+                continue
+            task = self.browse(int(op.get('task_id') or 0)).exists()
+            if not task:
+                result.update(status='error', message=_('Task not found.'))
+                continue
+            try:
+                with self.env.cr.savepoint():
+                    task.with_context(workplace_client_uuid=uuid)._run_terminal_action(op.get('action'), op.get('reason'))
+            except ValidationError as e:
+                self.env.invalidate_all()
+                result.update(status='conflict', message=e.args[0])
+            except UserError as e:
+                self.env.invalidate_all()
+                result.update(status='error', message=e.args[0])
+            else:
+                result.update(status='ok', task=task._terminal_payload()[0])
+        # An operation is a sign of life of the terminal, like a heartbeat.
+        if heartbeat:
+            self.env['workplace.operator.load']._heartbeat()
+        return results
+
+    @api.model
+    def _prepare_production_vals(self, production):
+        return {
+            'name': production.name,
+            'production_id': production.id,
+            'workplace_id': production.workplace_id.id,
+            'allowed_operators': [(6, 0, production.workplace_id.operator_ids.ids)],
+            'customer_order_number': production.origin,
+            'order_date': production.date_start or fields.Datetime.now(),
+        }
+
+    @api.model
+    def _create_from_productions(self, productions):
+        # allowed_operators is required: orders on a workplace without
+        # assigned operators are skipped until someone is assigned.
+        productions = productions.filtered(
+            lambda p: p.workplace_id.operator_ids and not p.workplace_task_ids and not p.workplace_task_history_ids
+        )
+        return self.create([self._prepare_production_vals(production) for production in productions])
+
+    @api.model
+    def _cron_generate_from_productions(self, batch_size=1000):
+        # Streams confirmed orders in id order; orders that already have a task,
+        # live or archived, are excluded by the query, so re-runs only create
+        # what is missing.
+        Production = self.env['mrp.production']
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        last_id = 0
+        created = 0
+        while True:
+            productions = Production.search([
+                ('state', '=', 'confirmed'),
+                ('workplace_id', '!=', False),
+                ('workplace_task_ids', '=', False),
+                ('workplace_task_history_ids', '=', False),
+                ('id', '>', last_id),
+            ], order='id', limit=batch_size)
+            if not productions:
+                break
+            last_id = productions[-1].id
+            created += len(self._create_from_productions(productions))
+            if auto_commit:
+                self.env.cr.commit()
+            self.env.invalidate_all()
+        _logger.info("Generated %s work tasks from manufacturing orders", created)
+
+    def _prepare_history_vals(self):
+        self.ensure_one()
+        return {
+            'task_ref': self.id,
+            'name': self.name,
+            'workplace_id': self.workplace_id.id,
+            'production_id': self.production_id.id,
+            'operator_ids': [(6, 0, self.operator_ids.ids)],
+            'allowed_operators': [(6, 0, self.allowed_operators.ids)],
+            'customer_order_number': self.customer_order_number,
+            'order_date': self.order_date,
+            'date_done': self.date_done or self.write_date,
+            'status': self.status,
+            'defect_reason': self.defect_reason,
+            'notes': self.notes,
+        }
+
+    def _archive_to_history(self):
+        history = self.env['workplace.task.history'].create([task._prepare_history_vals() for task in self])
+        history.flush_recordset()
+        self.env.cr.execute("""
+            UPDATE workplace_task_event e
+               SET history_id = h.id
+              FROM workplace_task_history h
+             WHERE h.id IN %s AND e.task_id = h.task_ref
+        """, [tuple(history.ids)])
+        self.unlink()
+        return history
+
+    @api.model
+    def _cron_archive_finished_tasks(self, batch_size=1000):
+        # Each batch is copied and deleted in its own transaction, so an
+        # interrupted run simply resumes with the next oldest finished tasks.
+        days = int(self.env['ir.config_parameter'].sudo().get_param('workplace_arm.archive_after_days', 90))
+        if days <= 0:
+            return
+        cutoff = fields.Datetime.subtract(fields.Datetime.now(), days=days)
+        domain = [
+            ('status', 'in', self.TERMINAL_STATUSES),
+            '|', ('date_done', '<', cutoff),
+            '&', ('date_done', '=', False), ('write_date', '<', cutoff),
+        ]
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        archived = 0
+        while True:
+            tasks = self.search(domain, order='id', limit=batch_size)
+            if not tasks:
+                break
+            tasks._archive_to_history()
+            archived += len(tasks)
+            if auto_commit:
+                self.env.cr.commit()
+            self.env.invalidate_all()
+        _logger.info("Archived %s finished work tasks older than %s days", archived, days)
@@ -0,0 +1,148 @@
+import functools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from odoo import models, fields, api, tools
+
+_logger = logging.getLogger(__name__)
+
+# Per-thread measurement state of the outermost instrumented call; nested
+# instrumented calls (a wizard clearing operators, a sync batch running
+# actions) are accounted to it.
+_probe = threading.local()
+
+
+@contextmanager
+def lock_timer():
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if getattr(_probe, 'depth', 0):
+            _probe.lock_time += time.perf_counter() - start
+
+
+def instrumented(action, workplace_path='workplace_id'):
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if getattr(_probe, 'depth', 0):
+                return method(self, *args, **kwargs)
+            workplace_ids = self.mapped(workplace_path).ids
+            thread = threading.current_thread()
+            self.env.flush_all()
+            _probe.depth, _probe.lock_time = 1, 0.0
+            query_count = self.env.cr.sql_log_count
+            query_time = getattr(thread, 'query_time', 0.0)
+            start = time.perf_counter()
+            try:
+                result = method(self, *args, **kwargs)
+                self.env.flush_all()
+            finally:
+                _probe.depth = 0
+            self.env['workplace.action.stat']._record(
+                action,
+                workplace_ids[0] if len(workplace_ids) == 1 else None,
+                len(self),
+                self.env.cr.sql_log_count - query_count,
+                getattr(thread, 'query_time', 0.0) - query_time,
+                _probe.lock_time,
+                time.perf_counter() - start,
+            )
+            return result
+        return wrapper
+    return decorator
+
+
+class WorkplaceActionStat(models.Model):
+    _name = 'workplace.action.stat'
+    _description = 'Task Action Timing'
+    _order = 'date desc, id desc'
+    _log_access = False
+
+    date = fields.Datetime('Date', readonly=True, required=True, index=True)
+    action = fields.Char('Action', readonly=True, required=True)
+    workplace_id = fields.Many2one('workplace.workplace', string='Workplace', readonly=True, ondelete='set null')
+    user_id = fields.Many2one('res.users', string='User', readonly=True, ondelete='set null')
+    record_count = fields.Integer('Records', readonly=True)
+    query_count = fields.Integer('Queries', readonly=True)
+    sql_ms = fields.Float('SQL (ms)', readonly=True)
+    lock_ms = fields.Float('Lock Wait (ms)', readonly=True)
+    python_ms = fields.Float('Python (ms)', readonly=True)
+    duration_ms = fields.Float('Total (ms)', readonly=True)
+    slow = fields.Boolean('Slow', readonly=True)
+
+    @api.model
+    def _record(self, action, workplace_id, record_count, query_count, sql_time, lock_time, duration):
+        # Written with plain SQL: operators have no access to this model and
+        # the hot path should not pay for an ORM create.
+        threshold = int(self.env['ir.config_parameter'].sudo().get_param('workplace_arm.slow_action_ms', 1000))
+        duration_ms = duration * 1000
+        slow = bool(threshold) and duration_ms >= threshold
+        if slow:
+            _logger.warning(
+                "Slow workplace action %s: %.0f ms, %s queries, %.0f ms SQL, %.0f ms lock wait "
+                "(workplace %s, %s records, uid %s)",
+                action, duration_ms, query_count, sql_time * 1000, lock_time * 1000,
+                workplace_id, record_count, self.env.uid,
+            )
+        self.env.cr.execute("""
+            INSERT INTO workplace_action_stat (date, action, workplace_id, user_id, record_count, query_count,
+                                               sql_ms, lock_ms, python_ms, duration_ms, slow)
+            VALUES (now() at time zone 'UTC', %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, [
+            action, workplace_id, self.env.uid, record_count, query_count, sql_time * 1000, lock_time * 1000,
+            max(duration - sql_time, 0.0) * 1000, duration_ms, slow,
+        ])
+
+    @api.model
+    def _cron_purge(self):
+        days = int(self.env['ir.config_parameter'].sudo().get_param('workplace_arm.action_stats_days', 14))
+        self.env.cr.execute("""
+            DELETE FROM workplace_action_stat
+             WHERE date < (now() at time zone 'UTC') - make_interval(days => %s)
+        """, [days])
+        _logger.info("Purged %s workplace action timings", self.env.cr.rowcount)
+
+
+class WorkplaceActionStatReport(models.Model):
+    _name = 'workplace.action.stat.report'
+    _description = 'Task Action Latency Percentiles'
+    _auto = False
+    _order = 'action, workplace_id'
+
+    action = fields.Char('Action', readonly=True)
+    workplace_id = fields.Many2one('workplace.workplace', string='Workplace', readonly=True)
+    call_count = fields.Integer('Calls', readonly=True)
+    slow_count = fields.Integer('Slow Calls', readonly=True)
+    avg_queries = fields.Float('Avg Queries', readonly=True)
+    avg_lock_ms = fields.Float('Avg Lock Wait (ms)', readonly=True)
+    p50_ms = fields.Float('p50 (ms)', readonly=True)
+    p95_ms = fields.Float('p95 (ms)', readonly=True)
+    p99_ms = fields.Float('p99 (ms)', readonly=True)
+    max_ms = fields.Float('Max (ms)', readonly=True)
+
+    def init(self):
+        # One row per action over all workplaces (workplace empty) and one per
+        # action and workplace.
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute("""
+            CREATE VIEW %s AS (
+                SELECT row_number() OVER (ORDER BY action, workplace_id NULLS FIRST) AS id,
+                       action,
+                       workplace_id,
+                       count(*) AS call_count,
+                       count(*) FILTER (WHERE slow) AS slow_count,
+                       avg(query_count) AS avg_queries,
+                       avg(lock_ms) AS avg_lock_ms,
+                       percentile_cont(0.5) WITHIN GROUP (ORDER BY duration_ms) AS p50_ms,
+                       percentile_cont(0.95) WITHIN GROUP (ORDER BY duration_ms) AS p95_ms,
+                       percentile_cont(0.99) WITHIN GROUP (ORDER BY duration_ms) AS p99_ms,
+                       max(duration_ms) AS max_ms
+                  FROM workplace_action_stat
+                 GROUP BY GROUPING SETS ((action), (action, workplace_id))
+                 HAVING GROUPING(workplace_id) = 1 OR workplace_id IS NOT NULL
+            )
+        """ % self._table)
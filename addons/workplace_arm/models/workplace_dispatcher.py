@@ -0,0 +1,83 @@
+import logging
+from collections import Counter
+
+from odoo import models, api
+
+_logger = logging.getLogger(__name__)
+
+
+class WorkplaceDispatcher(models.AbstractModel):
+    _name = 'workplace.dispatcher'
+    _description = 'Work Task Dispatcher'
+
+    @api.model
+    def _free_slots(self):
+        self.env.flush_all()
+        self.env.cr.execute("""
+            SELECT id, capacity - occupancy
+              FROM workplace_workplace
+             WHERE active AND status IN %s AND equipment_down IS NOT TRUE AND occupancy < capacity
+        """, [self.env['workplace.workplace'].CLAIMABLE_STATUSES])
+        return dict(self.env.cr.fetchall())
+
+    @api.model
+    def _compute_assignments(self):
+        # Greedy matching in order_date priority. Every operator gets at most
+        # one proposal and every workplace at most its free capacity. Among
+        # the allowed operators of a task, the one eligible for the fewest
+        # tasks goes first, so scarce operators are not used up early by
+        # tasks that had other candidates.
+        slots = self._free_slots()
+        if not slots:
+            return []
+        self.env.cr.execute("""
+            SELECT t.id, t.workplace_id, array_agg(a.res_users_id ORDER BY a.res_users_id)
+              FROM workplace_task t
+              JOIN workplace_task_allowed_operator_rel a ON a.workplace_task_id = t.id
+              JOIN res_users u ON u.id = a.res_users_id AND u.active
+             WHERE t.status = 'ready' AND t.workplace_id = ANY(%s)
+               AND NOT EXISTS (SELECT 1 FROM workplace_operator_load l
+                                WHERE l.user_id = a.res_users_id AND l.task_count > 0)
+             GROUP BY t.id
+             ORDER BY t.order_date NULLS LAST, t.id
+        """, [list(slots)])
+        candidates = self.env.cr.fetchall()
+        eligible = Counter(user_id for _task_id, _workplace_id, user_ids in candidates for user_id in user_ids)
+
+        assigned_users = set()
+        assignments = []
+        for task_id, workplace_id, user_ids in candidates:
+            if slots[workplace_id] <= 0:
+                continue
+            free = [user_id for user_id in user_ids if user_id not in assigned_users]
+            if not free:
+                continue
+            user_id = min(free, key=lambda uid: (eligible[uid], uid))
+            assigned_users.add(user_id)
+            slots[workplace_id] -= 1
+            assignments.append((task_id, user_id))
+        return assignments
+
+    @api.model
+    def _apply_assignments(self, assignments):
+        Task = self.env['workplace.task']
+        Task.flush_model(['proposed_user_id'])
+        self.env.cr.execute("""
+            UPDATE workplace_task SET proposed_user_id = NULL
+             WHERE proposed_user_id IS NOT NULL
+        """)
+        if assignments:
+            self.env.cr.execute("""
+                UPDATE workplace_task t
+                   SET proposed_user_id = d.user_id
+                  FROM unnest(%s::int[], %s::int[]) AS d(task_id, user_id)
+                 WHERE t.id = d.task_id
+            """, [[task_id for task_id, _uid in assignments], [uid for _task_id, uid in assignments]])
+        Task.invalidate_model(['proposed_user_id'])
+
+    @api.model
+    def _dispatch(self):
+        assignments = self._compute_assignments()
+        self._apply_assignments(assignments)
+        _logger.info("Dispatcher proposed %s task assignments", len(assignments))
+        return assignments
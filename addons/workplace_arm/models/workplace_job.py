@@ -0,0 +1,126 @@
+import json
+import logging
+import threading
+from collections import defaultdict
+from datetime import timedelta
+
+from odoo import models, fields, api
+from odoo.tools.sql import create_index
+
+_logger = logging.getLogger(__name__)
+
+
+class WorkplaceJob(models.Model):
+    _name = 'workplace.job'
+    _description = 'Workplace Background Job'
+    _order = 'eta desc, id desc'
+
+    name = fields.Char('Description', required=True, readonly=True)
+    model_name = fields.Char('Model', required=True, readonly=True)
+    method_name = fields.Char('Method', required=True, readonly=True)
+    record_ids = fields.Json('Records', readonly=True)
+    args = fields.Json('Arguments', readonly=True)
+    state = fields.Selection([  # pyright: ignore[reportArgumentType]
+        ('pending', 'Pending'),
+        ('done', 'Done'),
+        ('failed', 'Failed')
+    ], 'State', default='pending', required=True, readonly=True)
+    eta = fields.Datetime('Run After', required=True, readonly=True, default=lambda self: fields.Datetime.now())
+    attempts = fields.Integer('Attempts', readonly=True)
+    max_attempts = fields.Integer('Max Attempts', default=5, readonly=True)
+    last_error = fields.Text('Last Error', readonly=True)
+    date_done = fields.Datetime('Done On', readonly=True)
+
+    def init(self):
+        create_index(self.env.cr, 'workplace_job_pending_idx', self._table, ['eta', 'id'], where="state = 'pending'")
+
+    @api.model
+    def _enqueue(self, records, method_name, *args, description=None):
+        # Runs records.<method_name>(*args) later, as the current user, from
+        # the job cron. Arguments must be JSON-serializable.
+        job = self.sudo().create({
+            'name': description or '%s.%s' % (records._name, method_name),
+            'model_name': records._name,
+            'method_name': method_name,
+            'record_ids': records.ids,
+            'args': list(args),
+        })
+        self.env.ref('workplace_arm.ir_cron_run_workplace_jobs').sudo()._trigger()
+        return job
+
+    @api.model
+    def _cron_run(self):
+        # One cron runs at a time, which bounds concurrency; SKIP LOCKED lets a
+        # manual run work next to it without picking the same jobs.
+        batch_size = int(self.env['ir.config_parameter'].sudo().get_param('workplace_arm.job_batch_size', 100))
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        while True:
+            self.flush_model()
+            self.env.cr.execute("""
+                SELECT id FROM workplace_job
+                 WHERE state = 'pending' AND eta <= %s
+                 ORDER BY eta, id
+                 LIMIT %s
+                   FOR UPDATE SKIP LOCKED
+            """, [fields.Datetime.now(), batch_size])
+            jobs = self.browse(job_id for job_id, in self.env.cr.fetchall())
+            if not jobs:
+                break
+            jobs._run()
+            if auto_commit:
+                self.env.cr.commit()
+            self.env.invalidate_all()
+        self._gc_done()
+
+    def _run(self):
+        # Jobs calling the same method with the same arguments run as one call
+        # over all their records. If that call fails, each job runs alone so
+        # one bad record does not hold back the others.
+        groups = defaultdict(list)
+        for job in self:
+            groups[(job.model_name, job.method_name, json.dumps(job.args), job.create_uid.id)].append(job.id)
+        for job_ids in groups.values():
+            jobs = self.browse(job_ids)
+            if len(jobs) > 1 and jobs._execute():
+                continue
+            for job in jobs:
+                job._execute()
+
+    def _execute(self):
+        job = self[0]
+        record_ids = list(dict.fromkeys(record_id for job in self for record_id in job.record_ids or []))
+        try:
+            with self.env.cr.savepoint():
+                records = self.env[job.model_name].with_user(job.create_uid).browse(record_ids).exists()
+                getattr(records, job.method_name)(*(job.args or []))
+        except Exception as e:
+            self.env.invalidate_all()
+            if len(self) == 1:
+                self._fail(e)
+            return False
+        self.write({'state': 'done', 'date_done': fields.Datetime.now(), 'last_error': False})
+        return True
+
+    def _fail(self, error):
+        self.ensure_one()
+        attempts = self.attempts + 1
+        vals = {'attempts': attempts, 'last_error': str(error)}
+        if attempts >= self.max_attempts:
+            vals['state'] = 'failed'
+            _logger.error("Workplace job %s (%s) failed after %s attempts: %s", self.id, self.name, attempts, error)
+        else:
+            vals['eta'] = fields.Datetime.now() + timedelta(minutes=2 ** attempts)
+            _logger.warning("Workplace job %s (%s) failed, retrying: %s", self.id, self.name, error)
+        self.write(vals)
+
+    @api.model
+    def _gc_done(self):
+        days = int(self.env['ir.config_parameter'].sudo().get_param('workplace_arm.job_keep_days', 7))
+        self.env.cr.execute("""
+            DELETE FROM workplace_job
+             WHERE state = 'done' AND date_done < %s
+        """, [fields.Datetime.subtract(fields.Datetime.now(), days=days)])
+
+    def action_retry(self):
+        self.write({'state': 'pending', 'eta': fields.Datetime.now(), 'attempts': 0})
+        self.env.ref('workplace_arm.ir_cron_run_workplace_jobs').sudo()._trigger()
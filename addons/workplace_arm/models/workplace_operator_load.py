@@ -0,0 +1,161 @@
+import logging
+from collections import Counter
+
+from odoo import models, fields, api
+
+_logger = logging.getLogger(__name__)
+
+
+class WorkplaceOperatorLoad(models.Model):
+    _name = 'workplace.operator.load'
+    _description = 'Workplace Operator Load'
+    _log_access = False
+
+    workplace_id = fields.Many2one('workplace.workplace', string='Workplace', required=True, ondelete='cascade')
+    user_id = fields.Many2one('res.users', string='Operator', required=True, ondelete='cascade', index=True)
+    task_count = fields.Integer('Active Tasks', default=0,
+                                help='Tasks at this workplace the operator is currently working on')
+    since = fields.Datetime('Busy Since', help='Start of the current uninterrupted presence at the workplace')
+    last_heartbeat = fields.Datetime('Last Heartbeat', help='Last sign of life from the operator\'s terminal')
+
+    _sql_constraints = [
+        ('workplace_user_uniq', 'unique(workplace_id, user_id)', 'Only one load counter per workplace and operator.'),
+    ]
+
+    @api.model
+    def _apply_deltas(self, deltas):
+        # deltas: {(workplace_id, user_id): +n/-n}. Returns the new counters;
+        # a pair without a counter row counts as zero. Presence that ends here
+        # is booked as busy time in the shift statistics.
+        result = {}
+        now = fields.Datetime.now()
+        increments = {key: delta for key, delta in deltas.items() if delta > 0}
+        decrements = {key: delta for key, delta in deltas.items() if delta < 0}
+        if increments:
+            # A new presence starts without a heartbeat: only terminals send
+            # them, and the reaper leaves presences without one alone.
+            self.env.cr.execute("""
+                INSERT INTO workplace_operator_load (workplace_id, user_id, task_count, since)
+                SELECT d.workplace_id, d.user_id, d.delta, %s
+                  FROM unnest(%s::int[], %s::int[], %s::int[]) AS d(workplace_id, user_id, delta)
+                ON CONFLICT (workplace_id, user_id) DO UPDATE
+                   SET task_count = workplace_operator_load.task_count + EXCLUDED.task_count,
+                       last_heartbeat = CASE WHEN workplace_operator_load.task_count > 0
+                                             THEN workplace_operator_load.last_heartbeat END,
+                       since = CASE WHEN workplace_operator_load.task_count > 0
+                                    THEN COALESCE(workplace_operator_load.since, EXCLUDED.since)
+                                    ELSE EXCLUDED.since END
+                RETURNING workplace_id, user_id, task_count
+            """, [now] + self._unzip_deltas(increments))
+            result.update(((wid, uid), count) for wid, uid, count in self.env.cr.fetchall())
+        if decrements:
+            self.env.cr.execute("""
+                UPDATE workplace_operator_load l
+                   SET task_count = GREATEST(l.task_count + d.delta, 0),
+                       since = CASE WHEN l.task_count + d.delta > 0 THEN l.since END
+                  FROM unnest(%s::int[], %s::int[], %s::int[]) AS d(workplace_id, user_id, delta),
+                       workplace_operator_load old
+                 WHERE l.workplace_id = d.workplace_id AND l.user_id = d.user_id AND old.id = l.id
+                RETURNING l.workplace_id, l.user_id, l.task_count, old.since
+            """, self._unzip_deltas(decrements))
+            sessions = []
+            for wid, uid, count, since in self.env.cr.fetchall():
+                result[(wid, uid)] = count
+                if not count and since:
+                    sessions.append((wid, since, now))
+            self.env['workplace.stats']._record_busy_time(sessions)
+        if result:
+            self.invalidate_model(['task_count', 'since', 'last_heartbeat'])
+        return result
+
+    @api.model
+    def _unzip_deltas(self, deltas):
+        keys = list(deltas)
+        return [[wid for wid, _uid in keys], [uid for _wid, uid in keys], [deltas[key] for key in keys]]
+
+    @api.model
+    def _rebuild(self):
+        # Consistency repair: recount every (workplace, operator) pair from the
+        # task relation and every workplace occupancy from its own relation.
+        self.env.flush_all()
+        self.env.cr.execute("""
+            UPDATE workplace_operator_load SET task_count = 0 WHERE task_count <> 0
+        """)
+        self.env.cr.execute("""
+            INSERT INTO workplace_operator_load (workplace_id, user_id, task_count)
+            SELECT t.workplace_id, r.res_users_id, count(*)
+              FROM workplace_task_current_operator_rel r
+              JOIN workplace_task t ON t.id = r.workplace_task_id
+             WHERE t.workplace_id IS NOT NULL
+             GROUP BY t.workplace_id, r.res_users_id
+            ON CONFLICT (workplace_id, user_id) DO UPDATE
+               SET task_count = EXCLUDED.task_count
+        """)
+        self.env.cr.execute("""
+            UPDATE workplace_operator_load
+               SET since = CASE WHEN task_count > 0 THEN COALESCE(since, %s) END
+        """, [fields.Datetime.now()])
+        self.env.cr.execute("""
+            UPDATE workplace_workplace w
+               SET occupancy = c.occupancy
+              FROM (SELECT w2.id, count(r.res_users_id) AS occupancy
+                      FROM workplace_workplace w2
+                      LEFT JOIN workplace_current_operator_rel r ON r.workplace_workplace_id = w2.id
+                     GROUP BY w2.id) c
+             WHERE c.id = w.id AND w.occupancy IS DISTINCT FROM c.occupancy
+        """)
+        self.env.invalidate_all()
+
+    @api.model
+    def _heartbeat(self):
+        # Called by ARM terminals while the operator is working.
+        self.env.cr.execute("""
+            UPDATE workplace_operator_load SET last_heartbeat = %s
+             WHERE user_id = %s AND task_count > 0
+        """, [fields.Datetime.now(), self.env.uid])
+        count = self.env.cr.rowcount
+        self.invalidate_model(['last_heartbeat'])
+        return count
+
+    @api.model
+    def _cron_reap_stale_operators(self):
+        # Detaches operators whose terminal stopped sending heartbeats, with
+        # the same semantics as leaving the task, so phantom occupancy does
+        # not keep blocking workplace capacity. Only presences that got a
+        # heartbeat (terminal heartbeat, sync or scan) are reaped; the list,
+        # the form and single task action API calls never set one.
+        timeout = int(self.env['ir.config_parameter'].sudo().get_param('workplace_arm.heartbeat_timeout_minutes', 30))
+        if timeout <= 0:
+            return
+        cutoff = fields.Datetime.subtract(fields.Datetime.now(), minutes=timeout)
+        self.env.flush_all()
+        self.env.cr.execute("""
+            DELETE FROM workplace_task_current_operator_rel r
+             USING workplace_operator_load l, workplace_task t
+             WHERE l.task_count > 0 AND l.last_heartbeat < %s
+               AND t.workplace_id = l.workplace_id
+               AND r.workplace_task_id = t.id AND r.res_users_id = l.user_id
+            RETURNING r.workplace_task_id, r.res_users_id, t.workplace_id
+        """, [cutoff])
+        rows = self.env.cr.fetchall()
+        if not rows:
+            return
+        Task = self.env['workplace.task']
+        tasks = Task.browse(list({task_id for task_id, _user_id, _workplace_id in rows}))
+        tasks.invalidate_recordset(['current_operator_ids'])
+        tasks.modified(['current_operator_ids'])
+        deltas = Counter()
+        for _task_id, user_id, workplace_id in rows:
+            deltas[(workplace_id, user_id)] -= 1
+        Task._leave_idle_workplaces(deltas, self._apply_deltas(deltas))
+        now = fields.Datetime.now()
+        self.env['workplace.task.event'].create([{
+            'task_id': task_id,
+            'workplace_id': workplace_id,
+            'user_id': user_id,
+            'date': now,
+            'event_type': 'leave',
+        } for task_id, user_id, workplace_id in rows])
+        tasks._notify_board_changes()
+        _logger.info("Detached %s stale operators from %s tasks",
+                     len({user_id for _task_id, user_id, _workplace_id in rows}), len(tasks))
@@ -0,0 +1,169 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from odoo import models, fields, api
+
+
+class WorkplaceStats(models.Model):
+    _name = 'workplace.stats'
+    _description = 'Workplace Shift Statistics'
+    _order = 'date desc, shift desc, workplace_id'
+    _log_access = False
+
+    OUTCOME_STATUSES = ('completed', 'defect', 'cancelled')
+
+    workplace_id = fields.Many2one('workplace.workplace', string='Workplace', required=True, readonly=True,
+                                   ondelete='cascade')
+    date = fields.Date('Date', required=True, readonly=True, index=True)
+    shift = fields.Integer('Shift', required=True, readonly=True)
+    capacity = fields.Integer('Capacity', readonly=True)
+    completed_count = fields.Integer('Completed', readonly=True)
+    defect_count = fields.Integer('Defects', readonly=True)
+    cancelled_count = fields.Integer('Cancelled', readonly=True)
+    busy_minutes = fields.Float('Busy Operator Minutes', readonly=True)
+    defect_rate = fields.Float('Defect Rate (%)', compute='_compute_rates')
+    utilization = fields.Float('Utilization (%)', compute='_compute_rates')
+
+    _sql_constraints = [
+        ('workplace_shift_uniq', 'unique(workplace_id, date, shift)', 'Only one statistics row per workplace and shift.'),
+    ]
+
+    @api.depends('completed_count', 'defect_count', 'busy_minutes', 'capacity')
+    def _compute_rates(self):
+        shift_minutes = self._shift_hours() * 60
+        for record in self:
+            produced = record.completed_count + record.defect_count
+            record.defect_rate = produced and 100.0 * record.defect_count / produced
+            available = record.capacity * shift_minutes
+            record.utilization = available and 100.0 * record.busy_minutes / available
+
+    @api.model
+    def _shift_hours(self):
+        hours = int(self.env['ir.config_parameter'].sudo().get_param('workplace_arm.shift_hours', 8))
+        return min(max(hours, 1), 24)
+
+    @api.model
+    def _shift_key(self, dt, hours):
+        return dt.date(), dt.hour // hours + 1
+
+    @api.model
+    def _split_by_shift(self, start, end, hours):
+        # Yields (date, shift, minutes) for each shift the interval overlaps.
+        while start < end:
+            day, shift = self._shift_key(start, hours)
+            midnight = datetime.combine(day, time())
+            stop = min(end, midnight + timedelta(hours=shift * hours), midnight + timedelta(days=1))
+            yield day, shift, (stop - start).total_seconds() / 60
+            start = stop
+
+    @api.model
+    def _add(self, totals):
+        # totals: {(workplace_id, date, shift): [completed, defect, cancelled, busy_minutes]}
+        if not totals:
+            return
+        keys = list(totals)
+        self.env.cr.execute("""
+            INSERT INTO workplace_stats (workplace_id, date, shift, capacity,
+                                         completed_count, defect_count, cancelled_count, busy_minutes)
+            SELECT d.workplace_id, d.date, d.shift, w.capacity, d.completed, d.defect, d.cancelled, d.busy
+              FROM unnest(%s::int[], %s::date[], %s::int[], %s::int[], %s::int[], %s::int[], %s::float8[])
+                   AS d(workplace_id, date, shift, completed, defect, cancelled, busy)
+              JOIN workplace_workplace w ON w.id = d.workplace_id
+            ON CONFLICT (workplace_id, date, shift) DO UPDATE
+               SET capacity = EXCLUDED.capacity,
+                   completed_count = workplace_stats.completed_count + EXCLUDED.completed_count,
+                   defect_count = workplace_stats.defect_count + EXCLUDED.defect_count,
+                   cancelled_count = workplace_stats.cancelled_count + EXCLUDED.cancelled_count,
+                   busy_minutes = workplace_stats.busy_minutes + EXCLUDED.busy_minutes
+        """, [
+            [key[0] for key in keys],
+            [key[1] for key in keys],
+            [key[2] for key in keys],
+            [totals[key][0] for key in keys],
+            [totals[key][1] for key in keys],
+            [totals[key][2] for key in keys],
+            [totals[key][3] for key in keys],
+        ])
+        self.invalidate_model()
+
+    @api.model
+    def _record_outcomes(self, tasks, date=None):
+        # Books finished tasks by their final status into the shift of `date`
+        # (now by default).
+        hours = self._shift_hours()
+        day, shift = self._shift_key(date or fields.Datetime.now(), hours)
+        totals = defaultdict(lambda: [0, 0, 0, 0.0])
+        for task in tasks.filtered('workplace_id'):
+            if task.status in self.OUTCOME_STATUSES:
+                totals[(task.workplace_id.id, day, shift)][self.OUTCOME_STATUSES.index(task.status)] += 1
+        self._add(totals)
+
+    @api.model
+    def _record_busy_time(self, sessions):
+        # sessions: [(workplace_id, start, end)] of finished operator presence.
+        hours = self._shift_hours()
+        totals = defaultdict(lambda: [0, 0, 0, 0.0])
+        for workplace_id, start, end in sessions:
+            for day, shift, minutes in self._split_by_shift(start, end, hours):
+                totals[(workplace_id, day, shift)][3] += minutes
+        self._add(totals)
+
+    @api.model
+    def _rebuild(self):
+        # Backfill from the task event log: outcome counts per shift, and busy
+        # time as merged start→leave/finish intervals per workplace and operator.
+        self.env.flush_all()
+        hours = self._shift_hours()
+        self.env.cr.execute("DELETE FROM workplace_stats")
+        totals = defaultdict(lambda: [0, 0, 0, 0.0])
+        outcome_index = {'complete': 0, 'defect': 1, 'cancel': 2}
+        self.env.cr.execute("""
+            SELECT workplace_id, date_trunc('hour', date), event_type, count(*)
+              FROM workplace_task_event
+             WHERE event_type IN ('complete', 'defect', 'cancel') AND workplace_id IS NOT NULL
+             GROUP BY 1, 2, 3
+        """)
+        for workplace_id, hour, event_type, count in self.env.cr.fetchall():
+            day, shift = self._shift_key(hour, hours)
+            totals[(workplace_id, day, shift)][outcome_index[event_type]] += count
+
+        # The end of a start event is looked up by live task and by archived
+        # task in two branches, so each one can use its own index.
+        end_filter = """
+            x.id > s.id
+            AND (x.event_type IN ('complete', 'defect', 'cancel')
+                 OR (x.event_type IN ('start', 'leave') AND x.user_id = s.user_id))
+        """
+        self.env.cr.execute("""
+            SELECT s.workplace_id, s.user_id, s.date, e.date
+              FROM workplace_task_event s
+              JOIN LATERAL (
+                   SELECT y.date
+                     FROM ((SELECT x.date, x.id
+                              FROM workplace_task_event x
+                             WHERE x.task_id = s.task_id AND %(end_filter)s
+                             ORDER BY x.date, x.id
+                             LIMIT 1)
+                           UNION ALL
+                           (SELECT x.date, x.id
+                              FROM workplace_task_event x
+                             WHERE x.history_id = s.history_id AND %(end_filter)s
+                             ORDER BY x.date, x.id
+                             LIMIT 1)) y
+                    ORDER BY y.date, y.id
+                    LIMIT 1
+                   ) e ON TRUE
+             WHERE s.event_type = 'start' AND s.workplace_id IS NOT NULL
+             ORDER BY s.workplace_id, s.user_id, s.date
+        """ % {'end_filter': end_filter})
+        # Overlapping tasks of one operator at one workplace count once.
+        merged = []
+        for workplace_id, user_id, start, end in self.env.cr.fetchall():
+            if merged and merged[-1][:2] == [workplace_id, user_id] and start <= merged[-1][3]:
+                merged[-1][3] = max(merged[-1][3], end)
+            else:
+                merged.append([workplace_id, user_id, start, end])
+        for workplace_id, _user_id, start, end in merged:
+            for day, shift, minutes in self._split_by_shift(start, end, hours):
+                totals[(workplace_id, day, shift)][3] += minutes
+        self._add(totals)
@@ -0,0 +1,45 @@
+from odoo import models, fields, api
+from odoo.tools.sql import create_index
+
+
+class WorkTaskEvent(models.Model):
+    _name = 'workplace.task.event'
+    _description = 'Work Task Event'
+    _order = 'date desc, id desc'
+    _log_access = False
+
+    task_id = fields.Many2one('workplace.task', string='Task', readonly=True, ondelete='set null')
+    history_id = fields.Many2one('workplace.task.history', string='Archived Task', readonly=True,
+                                 ondelete='set null', index='btree_not_null')
+    workplace_id = fields.Many2one('workplace.workplace', string='Workplace', readonly=True)
+    user_id = fields.Many2one('res.users', string='User', readonly=True, index=True,
+                              default=lambda self: self.env.user)
+    date = fields.Datetime('Date', readonly=True, required=True, default=lambda self: fields.Datetime.now())
+    event_type = fields.Selection([  # pyright: ignore[reportArgumentType]
+        ('start', 'Started'),
+        ('leave', 'Left'),
+        ('complete', 'Completed'),
+        ('defect', 'Defect'),
+        ('cancel', 'Cancelled')
+    ], 'Event', readonly=True, required=True)
+    reason = fields.Text('Reason', readonly=True)
+    client_uuid = fields.Char('Client Operation', readonly=True, index='btree_not_null',
+                              help='Id of the terminal operation that produced this event')
+
+    def init(self):
+        create_index(self.env.cr, 'workplace_task_event_task_date_idx', self._table, ['task_id', 'date'])
+        create_index(self.env.cr, 'workplace_task_event_workplace_date_idx', self._table, ['workplace_id', 'date'])
+
+    @api.model
+    def _log(self, tasks, event_type, reason=False, user=None):
+        # Insert-only: one row per task and transition, in a single create().
+        now = fields.Datetime.now()
+        return self.create([{
+            'task_id': task.id,
+            'workplace_id': task.workplace_id.id,
+            'user_id': user.id if user else self.env.uid,
+            'date': now,
+            'event_type': event_type,
+            'reason': reason,
+            'client_uuid': self.env.context.get('workplace_client_uuid'),
+        } for task in tasks])
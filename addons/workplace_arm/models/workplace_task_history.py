@@ -0,0 +1,31 @@
+from odoo import models, fields
+
+
+class WorkTaskHistory(models.Model):
+    _name = 'workplace.task.history'
+    _description = 'Work Task History'
+    _rec_name = 'name'
+    _order = 'date_done desc, id desc'
+
+    task_ref = fields.Integer('Original Task ID', readonly=True, index=True)
+    name = fields.Char('Task Name', required=True, readonly=True)
+    workplace_id = fields.Many2one('workplace.workplace', string='Workplace', readonly=True, index=True)
+    production_id = fields.Many2one('mrp.production', string='Manufacturing Order', readonly=True, index=True)
+    operator_ids = fields.Many2many('res.users', 'workplace_task_history_operator_rel',
+                                   string='Operators', readonly=True)
+    allowed_operators = fields.Many2many('res.users', 'workplace_task_history_allowed_operator_rel',
+                                        string='Allowed Operators', readonly=True)
+
+    customer_order_number = fields.Char('Customer Order Number', readonly=True, index=True)
+    order_date = fields.Datetime('Order Date', readonly=True)
+    date_done = fields.Datetime('Finished On', readonly=True, index=True)
+
+    status = fields.Selection([  # pyright: ignore[reportArgumentType]
+        ('completed', 'Completed'),
+        ('defect', 'Defect'),
+        ('cancelled', 'Cancelled')
+    ], readonly=True, required=True, index=True)
+
+    defect_reason = fields.Text('Defect Reason', readonly=True)
+    notes = fields.Text('Notes', readonly=True)
+    event_ids = fields.One2many('workplace.task.event', 'history_id', string='Events', readonly=True)
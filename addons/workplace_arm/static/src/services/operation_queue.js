@@ -0,0 +1,123 @@
+/** @odoo-module **/
+
+import { browser } from "@web/core/browser/browser";
+import { _t } from "@web/core/l10n/translation";
+import { rpc } from "@web/core/network/rpc";
+import { registry } from "@web/core/registry";
+import { user } from "@web/core/user";
+import { session } from "@web/session";
+
+export const QUEUE_KEY = "workplace_arm.pending_operations";
+
+export const SYNC_BATCH_SIZE = 50;
+
+export const SYNC_INTERVAL = 30000;
+
+function newUuid() {
+    if (browser.crypto?.randomUUID) {
+        return browser.crypto.randomUUID();
+    }
+    return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+}
+
+// Terminal actions are recorded locally first and replayed on the server in
+// order, so a dropped connection on the shop floor does not lose a claim or
+// a completion. Every operation carries a uuid; the server skips the ones it
+// already applied, so a batch re-sent after a timeout is harmless.
+//
+// Terminals are shared: the queue is kept per database and user, and every
+// operation carries its user, so one operator's pending actions are never
+// replayed in another operator's session.
+export const operationQueueService = {
+    dependencies: ["notification"],
+
+    start(env, { notification }) {
+        let flushing = null;
+        const listeners = new Set();
+        const key = `${QUEUE_KEY}.${session.db}.${user.userId}`;
+        // Queue of earlier versions, shared by every user of the browser:
+        // its owner is unknown, so it is dropped rather than replayed.
+        browser.localStorage.removeItem(QUEUE_KEY);
+
+        function read() {
+            let operations;
+            try {
+                operations = JSON.parse(browser.localStorage.getItem(key)) || [];
+            } catch {
+                return [];
+            }
+            return operations.filter((operation) => operation.uid === user.userId);
+        }
+
+        function save(operations) {
+            browser.localStorage.setItem(key, JSON.stringify(operations));
+        }
+
+        async function send() {
+            let pending = read();
+            while (pending.length) {
+                const batch = pending.slice(0, SYNC_BATCH_SIZE);
+                let response;
+                try {
+                    response = await rpc("/workplace_arm/api/sync", { operations: batch }, { silent: true });
+                } catch {
+                    // Offline or server unreachable: keep the queue for the next attempt.
+                    return;
+                }
+                const done = new Set(response.results.map((result) => result.uuid));
+                for (const result of response.results) {
+                    if (result.status !== "ok") {
+                        notification.add(result.message || _t("The operation could not be applied."), {
+                            title: _t("Task %s was not updated", result.task_id),
+                            type: "warning",
+                        });
+                    }
+                }
+                pending = read().filter((operation) => !done.has(operation.uuid));
+                save(pending);
+                for (const listener of listeners) {
+                    listener(response.results);
+                }
+            }
+        }
+
+        function flush() {
+            if (!flushing) {
+                flushing = send().finally(() => {
+                    flushing = null;
+                });
+            }
+            return flushing;
+        }
+
+        browser.addEventListener("online", flush);
+        browser.setInterval(flush, SYNC_INTERVAL);
+        flush();
+
+        return {
+            get pending() {
+                return read();
+            },
+            enqueue(taskId, action, reason = false) {
+                const operations = read();
+                operations.push({
+                    uuid: newUuid(),
+                    uid: user.userId,
+                    task_id: taskId,
+                    action,
+                    reason,
+                    queued_at: Date.now(),
+                });
+                save(operations);
+                return flush();
+            },
+            flush,
+            onSynced(listener) {
+                listeners.add(listener);
+                return () => listeners.delete(listener);
+            },
+        };
+    },
+};
+
+registry.category("services").add("workplace_arm.operation_queue", operationQueueService);
@@ -0,0 +1,28 @@
+/** @odoo-module **/
+
+import { Component, useState } from "@odoo/owl";
+import { Dialog } from "@web/core/dialog/dialog";
+
+// Asks for the defect reason on the board itself, so the defect goes through
+// the offline operation queue like the other terminal actions.
+export class DefectReasonDialog extends Component {
+    static template = "workplace_arm.DefectReasonDialog";
+    static components = { Dialog };
+    static props = {
+        close: Function,
+        confirm: Function,
+    };
+
+    setup() {
+        this.state = useState({ reason: "" });
+    }
+
+    async confirm() {
+        const reason = this.state.reason.trim();
+        if (!reason) {
+            return;
+        }
+        this.props.close();
+        await this.props.confirm(reason);
+    }
+}
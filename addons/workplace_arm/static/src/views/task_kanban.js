@@ -0,0 +1,112 @@
+/** @odoo-module **/
+
+import { onWillStart, onWillUnmount } from "@odoo/owl";
+import { rpc } from "@web/core/network/rpc";
+import { registry } from "@web/core/registry";
+import { useService } from "@web/core/utils/hooks";
+import { kanbanView } from "@web/views/kanban/kanban_view";
+import { KanbanController } from "@web/views/kanban/kanban_controller";
+import { DefectReasonDialog } from "./defect_reason_dialog";
+
+export const TASK_UPDATE = "workplace_arm/task_update";
+
+export const HEARTBEAT_INTERVAL = 60000;
+
+// Object buttons replayed through the offline operation queue, by the
+// action name the terminal API uses.
+export const QUEUED_BUTTONS = {
+    action_start_work: "claim",
+    action_complete: "complete",
+    action_remove_operator: "leave",
+    action_defect: "defect",
+};
+
+export function boardChannel(workplaceId) {
+    return `workplace_arm_workplace_${workplaceId}`;
+}
+
+export class WorkplaceTaskKanbanController extends KanbanController {
+    setup() {
+        super.setup();
+        this.busService = useService("bus_service");
+        this.orm = useService("orm");
+        this.dialog = useService("dialog");
+        this.operationQueue = useService("workplace_arm.operation_queue");
+        this.channels = [];
+        this.onTaskUpdate = (payload) => this.applyTaskUpdate(payload);
+
+        onWillStart(async () => {
+            const workplaceIds = await this.orm.search("workplace.workplace", []);
+            this.channels = workplaceIds.map(boardChannel);
+            for (const channel of this.channels) {
+                this.busService.addChannel(channel);
+            }
+            this.busService.subscribe(TASK_UPDATE, this.onTaskUpdate);
+            this.stopSynced = this.operationQueue.onSynced(() => this.model.root.load());
+            // Keeps the operator attached to their workplaces while the
+            // board is open; the server reaps sessions that stop beating.
+            this.heartbeat = setInterval(() => rpc("/workplace_arm/api/heartbeat", {}), HEARTBEAT_INTERVAL);
+        });
+        onWillUnmount(() => {
+            clearInterval(this.heartbeat);
+            this.stopSynced?.();
+            this.busService.unsubscribe(TASK_UPDATE, this.onTaskUpdate);
+            for (const channel of this.channels) {
+                this.busService.deleteChannel(channel);
+            }
+        });
+    }
+
+    async beforeExecuteActionButton(clickParams, resParams) {
+        const action = clickParams.type === "object" && QUEUED_BUTTONS[clickParams.name];
+        const resId = resParams?.resId;
+        if (!action || !resId) {
+            return super.beforeExecuteActionButton(...arguments);
+        }
+        if (action === "defect") {
+            // The reason is asked here instead of in the wizard, whose confirm
+            // would be a blocking call.
+            this.dialog.add(DefectReasonDialog, {
+                confirm: (reason) => this.operationQueue.enqueue(resId, action, reason),
+            });
+            return false;
+        }
+        await this.operationQueue.enqueue(resId, action);
+        return false;
+    }
+
+    get loadedRecords() {
+        const root = this.model.root;
+        return root.isGrouped ? root.groups.flatMap((group) => group.list.records) : root.records;
+    }
+
+    async applyTaskUpdate({ tasks }) {
+        const records = this.loadedRecords;
+        const changed = [];
+        let moved = false;
+        for (const task of tasks) {
+            const record = records.find((rec) => rec.resId === task.id);
+            if (!record) {
+                continue;
+            }
+            if (record.data.status !== task.status) {
+                moved = true;
+            } else {
+                changed.push(record);
+            }
+        }
+        if (moved) {
+            // A card changed column: refresh the board data, not the client.
+            await this.model.root.load();
+        } else {
+            await Promise.all(changed.map((record) => record.load()));
+        }
+    }
+}
+
+export const workplaceTaskKanbanView = {
+    ...kanbanView,
+    Controller: WorkplaceTaskKanbanController,
+};
+
+registry.category("views").add("workplace_task_kanban", workplaceTaskKanbanView);
@@ -1,2 +1,4 @@
 from . import test_workplace
 from . import test_workplace_task
+from . import test_claim_concurrency
+from . import test_performance
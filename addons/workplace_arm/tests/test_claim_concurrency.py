@@ -0,0 +1,119 @@
+import logging
+import random
+import threading
+import time
+
+from psycopg2 import errors as pgerrors
+
+from odoo import api, SUPERUSER_ID
+from odoo.exceptions import ValidationError
+from odoo.modules.registry import Registry
+from odoo.service.model import MAX_TRIES_ON_CONCURRENCY_FAILURE
+from odoo.tests.common import BaseCase, get_db_name, tagged
+
+_logger = logging.getLogger(__name__)
+
+CLAIMERS = 60
+CAPACITY = 5
+
+
+@tagged('post_install', '-at_install', '-standard', 'workplace_stress')
+class TestClaimConcurrency(BaseCase):
+    # Runs on real, committed cursors: every thread is its own transaction,
+    # exactly like concurrent RPCs from shop-floor terminals.
+
+    def setUp(self):
+        super().setUp()
+        self.registry = Registry(get_db_name())
+        suffix = '%d_%d' % (time.time_ns(), random.randint(0, 10**6))
+        with self.registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            users = env['res.users'].create([{
+                'name': 'Stress Operator %s' % i,
+                'login': 'stress_operator_%s_%s' % (suffix, i),
+            } for i in range(CLAIMERS)])
+            workplace = env['workplace.workplace'].create({
+                'name': 'Stress Workplace',
+                'code': 'WP_STRESS_%s' % suffix,
+                'capacity': CAPACITY,
+                'operator_ids': [(6, 0, users.ids)],
+            })
+            tasks = env['workplace.task'].create([{
+                'name': 'Stress Task %s' % i,
+                'workplace_id': workplace.id,
+                'allowed_operators': [(6, 0, users.ids)],
+            } for i in range(CLAIMERS)])
+            self.user_ids = users.ids
+            self.workplace_id = workplace.id
+            self.task_ids = tasks.ids
+        self.addCleanup(self._cleanup)
+
+    def _cleanup(self):
+        with self.registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            env['workplace.task'].browse(self.task_ids).unlink()
+            env['workplace.workplace'].browse(self.workplace_id).unlink()
+            env['res.users'].browse(self.user_ids).unlink()
+
+    def _claim(self, uid, task_id, barrier, results):
+        barrier.wait()
+        start = time.perf_counter()
+        outcome = 'retries_exhausted'
+        retries = 0
+        for tryno in range(1, MAX_TRIES_ON_CONCURRENCY_FAILURE + 1):
+            try:
+                with self.registry.cursor() as cr:
+                    env = api.Environment(cr, uid, {})
+                    env['workplace.task'].browse(task_id).action_start_work()
+                outcome = 'claimed'
+                break
+            except ValidationError:
+                outcome = 'rejected'
+                break
+            except (pgerrors.SerializationFailure, pgerrors.DeadlockDetected):
+                if tryno == MAX_TRIES_ON_CONCURRENCY_FAILURE:
+                    break
+                # Same tries and back-off as the RPC layer (odoo.service.model.retrying).
+                retries += 1
+                time.sleep(random.uniform(0.0, 2 ** tryno))
+        results.append((outcome, time.perf_counter() - start, retries))
+
+    def test_concurrent_claims_respect_capacity(self):
+        barrier = threading.Barrier(CLAIMERS)
+        results = []
+        threads = [
+            threading.Thread(target=self._claim, args=(uid, task_id, barrier, results))
+            for uid, task_id in zip(self.user_ids, self.task_ids)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        with self.registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            workplace = env['workplace.workplace'].browse(self.workplace_id)
+            tasks = env['workplace.task'].browse(self.task_ids)
+            occupancy = len(workplace.current_operator_ids)
+            started = tasks.filtered(lambda t: t.status == 'in_progress')
+
+        outcomes = [outcome for outcome, _latency, _retries in results]
+        claimed = [latency for outcome, latency, _retries in results if outcome == 'claimed']
+        latencies = sorted(latency for _outcome, latency, _retries in results)
+        retries = [count for _outcome, _latency, count in results]
+        _logger.info(
+            "%s concurrent claims: %s claimed, %s rejected, p50 %.1f ms, p95 %.1f ms, max %.1f ms, "
+            "%s retries (%s claims retried, at most %s times)",
+            CLAIMERS, len(claimed), outcomes.count('rejected'),
+            latencies[len(latencies) // 2] * 1000,
+            latencies[int(len(latencies) * 0.95) - 1] * 1000,
+            latencies[-1] * 1000,
+            sum(retries), sum(1 for count in retries if count), max(retries),
+        )
+
+        self.assertEqual(len(results), CLAIMERS)
+        self.assertNotIn('retries_exhausted', outcomes)
+        self.assertLessEqual(occupancy, CAPACITY)
+        self.assertEqual(len(started), len(claimed))
+        self.assertEqual(occupancy, len(claimed))
+        self.assertEqual(len(claimed), CAPACITY)
@@ -0,0 +1,218 @@
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager, nullcontext
+
+from odoo import fields
+from odoo.tests.common import TransactionCase, tagged
+
+_logger = logging.getLogger(__name__)
+
+
+@tagged('post_install', '-at_install', '-standard', 'workplace_benchmark')
+class TestWorkplacePerformance(TransactionCase):
+    # Not part of the default run:
+    #   WORKPLACE_BENCHMARK_OUTPUT=/tmp/bench.json \
+    #   odoo-bin -d <db> --test-tags /workplace_arm:workplace_benchmark --stop-after-init
+    # WORKPLACE_BENCHMARK_SCALE shrinks or grows the seeded volumes (default 1).
+
+    WORKPLACES = 1000
+    TASKS = 100000
+    OPERATORS = 500
+    # Ready tasks of one workplace, for the largest batch of the batch actions.
+    BULK_TASKS = 1000
+
+    # Upper bounds on queries per call. The batch actions must not depend on
+    # the number of tasks, so the same budget applies to N=1, 100 and 1000.
+    QUERY_BUDGETS = {
+        'action_start_work': 45,
+        'action_remove_operator': 35,
+        'action_complete': 45,
+        'defect_wizard': 50,
+        'cancel_wizard': 50,
+        'read_group_status': 5,
+        'list_read': 6,
+        'kanban_read': 10,
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.results = []
+        scale = float(os.environ.get('WORKPLACE_BENCHMARK_SCALE', 1))
+        cls.scale = scale
+        cls.Workplace = cls.env['workplace.workplace']
+        cls.WorkTask = cls.env['workplace.task']
+
+        start = time.perf_counter()
+        cls.operators = cls.env['res.users'].create([{
+            'name': 'Benchmark Operator %s' % i,
+            'login': 'workplace_benchmark_operator_%s' % i,
+        } for i in range(max(int(cls.OPERATORS * scale), 3))])
+        cls.operator = cls.operators[0]
+        workplace_count = max(int(cls.WORKPLACES * scale), 1)
+        cls.workplaces = cls.Workplace.create([{
+            'name': 'Benchmark Workplace %s' % i,
+            'code': 'WP_BENCH_%s' % i,
+            'capacity': 2,
+            'operator_ids': [(4, operator.id) for operator in cls._pool(i)],
+        } for i in range(workplace_count)])
+        task_count = max(int(cls.TASKS * scale), workplace_count)
+        for offset in range(0, task_count, 10000):
+            cls.WorkTask.create([{
+                'name': 'Benchmark Task %s' % i,
+                'workplace_id': cls.workplaces[i % workplace_count].id,
+                'customer_order_number': 'SO%06d' % i,
+                'order_date': fields.Datetime.now(),
+                'allowed_operators': [(4, operator.id) for operator in cls._pool(i % workplace_count)],
+            } for i in range(offset, min(offset + 10000, task_count))])
+        bulk_operator = cls.operators[0]
+        cls.bulk_workplace = cls.Workplace.create({
+            'name': 'Benchmark Bulk Workplace',
+            'code': 'WP_BENCH_BULK',
+            'capacity': 2,
+            'operator_ids': [(4, bulk_operator.id)],
+        })
+        cls.bulk_count = max(int(cls.BULK_TASKS * scale), 1)
+        cls.WorkTask.create([{
+            'name': 'Benchmark Bulk Task %s' % i,
+            'workplace_id': cls.bulk_workplace.id,
+            'customer_order_number': 'BULK%06d' % i,
+            'order_date': fields.Datetime.now(),
+            'allowed_operators': [(4, bulk_operator.id)],
+        } for i in range(cls.bulk_count)])
+        cls.env.flush_all()
+        _logger.info(
+            "Seeded %s workplaces, %s tasks, %s operators in %.1f s",
+            workplace_count, task_count, len(cls.operators), time.perf_counter() - start,
+        )
+
+    @classmethod
+    def _pool(cls, index):
+        # Operators allowed on a workplace and its tasks; the first one is
+        # allowed on every task of that workplace.
+        count = len(cls.operators)
+        return cls.operators[index % count] | cls.operators[(index + 1) % count] | cls.operators[(index + 7) % count]
+
+    @classmethod
+    def tearDownClass(cls):
+        output = os.environ.get('WORKPLACE_BENCHMARK_OUTPUT')
+        if output:
+            with open(output, 'w') as f:
+                json.dump({
+                    'date': fields.Datetime.now().isoformat(),
+                    'database': cls.env.cr.dbname,
+                    'scale': cls.scale,
+                    'results': cls.results,
+                }, f, indent=2)
+            _logger.info("Benchmark results written to %s", output)
+        super().tearDownClass()
+
+    def _ready_tasks(self, workplace, count):
+        return self.WorkTask.search([('workplace_id', '=', workplace.id), ('status', '=', 'ready')], limit=count)
+
+    @contextmanager
+    def _measure(self, label, count=1, budget=None):
+        self.env.flush_all()
+        self.env.invalidate_all()
+        queries = self.cr.sql_log_count
+        start = time.perf_counter()
+        with self.assertQueryCount(budget) if budget is not None else nullcontext():
+            yield
+            self.env.flush_all()
+        result = {
+            'label': label,
+            'count': count,
+            'queries': self.cr.sql_log_count - queries,
+            'ms': round((time.perf_counter() - start) * 1000, 1),
+            'budget': budget,
+        }
+        self.results.append(result)
+        _logger.info("%(label)s N=%(count)s: %(queries)s queries, %(ms).1f ms", result)
+
+    def test_batch_actions_query_count(self):
+        for count, workplace in ((1, self.workplaces[0]), (100, self.workplaces[-1]),
+                                 (self.bulk_count, self.bulk_workplace)):
+            tasks = self._ready_tasks(workplace, count).with_user(workplace.operator_ids[0])
+            with self._measure('action_start_work', count, self.QUERY_BUDGETS['action_start_work']):
+                tasks.action_start_work()
+            with self._measure('action_remove_operator', count, self.QUERY_BUDGETS['action_remove_operator']):
+                tasks.action_remove_operator()
+            tasks.action_start_work()
+            with self._measure('action_complete', count, self.QUERY_BUDGETS['action_complete']):
+                tasks.action_complete()
+            self.assertFalse(workplace.current_operator_ids)
+
+    def test_wizard_confirmations(self):
+        workplace = self.workplaces[0]
+        operator = workplace.operator_ids[0]
+        defect, cancel = self._ready_tasks(workplace, 2).with_user(operator)
+        (defect | cancel).action_start_work()
+        wizard = self.env['workplace.defect.wizard'].with_user(operator).create({
+            'task_ids': defect.ids,
+            'defect_reason': 'Benchmark defect',
+        })
+        with self._measure('defect_wizard', 1, self.QUERY_BUDGETS['defect_wizard']):
+            wizard.action_confirm_defect()
+        wizard = self.env['workplace.cancel.wizard'].with_user(operator).create({
+            'task_ids': cancel.ids,
+            'cancel_reason': 'Benchmark cancel',
+        })
+        with self._measure('cancel_wizard', 1, self.QUERY_BUDGETS['cancel_wizard']):
+            wizard.action_confirm_cancel()
+        self.assertEqual((defect | cancel).mapped('status'), ['defect', 'cancelled'])
+
+    def test_board_reads(self):
+        with self._measure('read_group_status', 1, self.QUERY_BUDGETS['read_group_status']):
+            groups = self.WorkTask.read_group([], ['status'], ['status'])
+        self.assertEqual(sum(group['status_count'] for group in groups), self.WorkTask.search_count([]))
+        with self._measure('list_read', 80, self.QUERY_BUDGETS['list_read']):
+            self.WorkTask.search_read(
+                [('status', '=', 'ready')],
+                ['name', 'workplace_id', 'customer_order_number', 'order_date', 'status'],
+                limit=80,
+            )
+        with self._measure('kanban_read', 40, self.QUERY_BUDGETS['kanban_read']):
+            self.WorkTask.web_search_read([('status', '=', 'ready')], {
+                'name': {},
+                'color': {},
+                'status': {},
+                'workplace_id': {'fields': {'display_name': {}}},
+                'allowed_operators': {'fields': {'display_name': {}}},
+                'current_operator_ids': {'fields': {'display_name': {}}},
+                'proposed_user_id': {'fields': {'display_name': {}}},
+            }, limit=40)
+
+    def test_search_as_you_type(self):
+        # Each keystroke of a partial order number or task name.
+        for field_name, term in (('customer_order_number', '4242'), ('name', 'Task 4242')):
+            for length in range(2, len(term) + 1):
+                with self._measure('search %s ilike %r' % (field_name, term[:length]), 80):
+                    self.WorkTask.search([(field_name, 'ilike', term[:length])], limit=80)
+        self.cr.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        if self.cr.rowcount:
+            self.cr.execute(
+                "EXPLAIN SELECT id FROM workplace_task WHERE customer_order_number ILIKE %s", ['%4242%'],
+            )
+            plan = '\n'.join(row for row, in self.cr.fetchall())
+            self.assertIn('workplace_task__customer_order_number_index', plan)
+
+    def test_color_read(self):
+        tasks = self.WorkTask.search([('status', '=', 'ready')], limit=10000)
+        tasks[::2].write({'status': 'completed'})
+        with self._measure('compute color in Python (former non-stored path)', len(tasks)):
+            tasks._compute_color()
+        with self._measure('read stored color', len(tasks)):
+            tasks.read(['color'])
+        self.assertEqual(set(tasks.mapped('color')), {0, 10})
+
+    def test_workplace_import(self):
+        vals_list = [{
+            'name': 'Imported Workplace %s' % i,
+            'code': 'WP_IMPORT_%05d' % i,
+            'capacity': 1 + i % 3,
+        } for i in range(5000)]
+        with self._measure('create workplaces in one batch', len(vals_list)):
+            self.Workplace.create(vals_list)
+        self.assertEqual(self.Workplace.search_count([('code', '=like', 'WP_IMPORT_%')]), 5000)
@@ -1,5 +1,8 @@
+from psycopg2 import IntegrityError
+
 from odoo.tests.common import TransactionCase
 from odoo.exceptions import ValidationError
+from odoo.tools import mute_logger
 
 
 class TestWorkplace(TransactionCase):
@@ -43,7 +46,7 @@ class TestWorkplace(TransactionCase):
             'capacity': 1,
         })
         
-        with self.assertRaises(ValidationError): 
+        with self.assertRaises(IntegrityError), mute_logger('odoo.sql_db'), self.cr.savepoint():
             self.Workplace.create({
                 'name': 'Workplace 2',
                 'code': 'WP_TEST_002',
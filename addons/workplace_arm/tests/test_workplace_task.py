@@ -1,3 +1,4 @@
+from odoo import fields
 from odoo.tests.common import TransactionCase
 from odoo.exceptions import ValidationError
 
@@ -223,3 +224,628 @@ class TestWorkplaceTask(TransactionCase):
         task.action_complete()
         self.assertEqual(task.status, 'completed')
         self.assertEqual(len(task.current_operator_ids), 0)
+
+    def test_batch_actions(self):
+        workplace2 = self.Workplace.create({
+            'name': 'Test Workplace 2',
+            'code': 'WP_TEST_TASK_002',
+            'capacity': 1,
+        })
+        tasks = self.WorkTask.create([{
+            'name': 'Batch Task %s' % i,
+            'workplace_id': (self.workplace if i % 2 else workplace2).id,
+            'allowed_operators': [(4, self.user1.id)],
+        } for i in range(6)])
+        
+        tasks.with_user(self.user1).action_start_work()
+        self.assertEqual(set(tasks.mapped('status')), {'in_progress'})
+        self.assertIn(self.user1, self.workplace.current_operator_ids)
+        self.assertIn(self.user1, workplace2.current_operator_ids)
+        
+        tasks[:2].with_user(self.user1).action_remove_operator()
+        self.assertIn(self.user1, self.workplace.current_operator_ids)
+        self.assertIn(self.user1, workplace2.current_operator_ids)
+        
+        tasks[2:].with_user(self.user1).action_remove_operator()
+        self.assertNotIn(self.user1, self.workplace.current_operator_ids)
+        self.assertNotIn(self.user1, workplace2.current_operator_ids)
+        
+        tasks.with_user(self.user1).action_start_work()
+        tasks.action_complete()
+        self.assertEqual(set(tasks.mapped('status')), {'completed'})
+        self.assertFalse(tasks.current_operator_ids)
+        self.assertFalse(self.workplace.current_operator_ids)
+        self.assertFalse(workplace2.current_operator_ids)
+
+    def test_batch_start_work_validation(self):
+        tasks = self.WorkTask.create([{
+            'name': 'Batch Task 1',
+            'workplace_id': self.workplace.id,
+            'allowed_operators': [(4, self.user1.id)],
+        }, {
+            'name': 'Batch Task 2',
+            'workplace_id': self.workplace.id,
+            'allowed_operators': [(4, self.user2.id)],
+        }])
+        
+        with self.assertRaises(ValidationError):
+            tasks.with_user(self.user1).action_start_work()
+        self.assertEqual(set(tasks.mapped('status')), {'ready'})
+
+    def test_operator_load_counters(self):
+        Load = self.env['workplace.operator.load']
+        tasks = self.WorkTask.create([{
+            'name': 'Load Task %s' % i,
+            'workplace_id': self.workplace.id,
+            'allowed_operators': [(4, self.user1.id)],
+        } for i in range(2)])
+        
+        tasks.with_user(self.user1).action_start_work()
+        self.assertEqual(self.workplace.occupancy, 1)
+        load = Load.search([('workplace_id', '=', self.workplace.id), ('user_id', '=', self.user1.id)])
+        self.assertEqual(load.task_count, 2)
+        
+        tasks[0].action_complete()
+        self.assertEqual(load.task_count, 1)
+        self.assertIn(self.user1, self.workplace.current_operator_ids)
+        
+        tasks[1].with_user(self.user1).action_remove_operator()
+        self.assertEqual(load.task_count, 0)
+        self.assertEqual(self.workplace.occupancy, 0)
+
+    def test_operator_load_rebuild(self):
+        Load = self.env['workplace.operator.load']
+        task = self.WorkTask.create({
+            'name': 'Test Task',
+            'workplace_id': self.workplace.id,
+            'allowed_operators': [(4, self.user1.id)],
+        })
+        task.with_user(self.user1).action_start_work()
+        load = Load.search([('workplace_id', '=', self.workplace.id), ('user_id', '=', self.user1.id)])
+        load.task_count = 7
+        
+        Load._rebuild()
+        self.assertEqual(load.task_count, 1)
+        self.assertEqual(self.workplace.occupancy, 1)
+
+    def test_read_group_status_columns(self):
+        self.WorkTask.create([{
+            'name': 'Group Task %s' % status,
+            'workplace_id': self.workplace.id,
+            'allowed_operators': [(4, self.user1.id)],
+            'status': status,
+        } for status in ('ready', 'completed')])
+        domain = [('workplace_id', '=', self.workplace.id)]
+        
+        groups = self.WorkTask.read_group(domain, ['status'], ['status'])
+        self.assertEqual([g['status'] for g in groups], ['ready', 'in_progress', 'completed', 'defect', 'cancelled'])
+        self.assertEqual([g['status_count'] for g in groups], [1, 0, 1, 0, 0])
+        
+        old = self.WorkTask.search(domain + [('status', '=', 'completed')])
+        old.date_done = '2000-01-01 00:00:00'
+        self.env['ir.config_parameter'].sudo().set_param('workplace_arm.board_history_days', 30)
+        groups = self.WorkTask.read_group(domain, ['status'], ['status'])
+        self.assertEqual([g['status_count'] for g in groups], [1, 0, 0, 0, 0])
+
+    def test_archive_finished_tasks(self):
+        History = self.env['workplace.task.history']
+        old_task, recent_task, live_task = self.WorkTask.create([{
+            'name': 'Archive Task %s' % i,
+            'workplace_id': self.workplace.id,
+            'allowed_operators': [(4, self.user1.id)],
+            'operator_ids': [(4, self.user1.id)],
+        } for i in range(3)])
+        (old_task | recent_task).write({'status': 'defect', 'defect_reason': 'Crack'})
+        old_task.date_done = '2000-01-01 00:00:00'
+        old_id = old_task.id
+        
+        self.WorkTask._cron_archive_finished_tasks(batch_size=1)
+        
+        self.assertFalse(old_task.exists())
+        self.assertTrue(recent_task.exists())
+        self.assertTrue(live_task.exists())
+        history = History.search([('task_ref', '=', old_id)])
+        self.assertEqual(history.status, 'defect')
+        self.assertEqual(history.defect_reason, 'Crack')
+        self.assertIn(self.user1, history.operator_ids)
+        self.assertIn(self.user1, history.allowed_operators)
+
+    def test_get_claimable_tasks(self):
+        ready, other_operator, started = self.WorkTask.create([{
+            'name': 'Claimable Task',
+            'workplace_id': self.workplace.id,
+            'allowed_operators': [(4, self.user1.id)],
+            'customer_order_number': '118',
+        }, {
+            'name': 'Other Operator Task',
+            'workplace_id': self.workplace.id,
+            'allowed_operators': [(4, self.user2.id)],
+        }, {
+            'name': 'Started Task',
+            'workplace_id': self.workplace.id,
+            'allowed_operators': [(4, self.user1.id)],
+            'status': 'in_progress',
+        }])
+        
+        tasks = self.WorkTask.with_user(self.user1)._get_claimable_tasks(self.workplace.id)
+        self.assertEqual([t['id'] for t in tasks], [ready.id])
+        self.assertEqual(tasks[0]['customer_order_number'], '118')
+        cursor = self.WorkTask._encode_cursor(tasks[0]['order_date'], ready.id)
+        self.assertFalse(self.WorkTask.with_user(self.user1)._get_claimable_tasks(self.workplace.id, cursor=cursor))
+
+    def test_filter_allowed_for(self):
+        tasks = self.WorkTask.create([{
+            'name': 'Allowed Task',
+            'workplace_id': self.workplace.id,
+            'allowed_operators': [(4, self.user1.id), (4, self.user2.id)],
+        }, {
+            'name': 'Other Task',
+            'workplace_id': self.workplace.id,
+            'allowed_operators': [(4, self.user2.id)],
+        }])
+        
+        self.assertEqual(tasks._filter_allowed_for(self.user1), tasks[0])
+        self.assertEqual(tasks._filter_allowed_for(self.user2), tasks)
+
+    def test_generate_tasks_from_productions(self):
+        product = self.env['product.product'].create({'name': 'Test Part', 'type': 'consu'})
+        productions = self.env['mrp.production'].create([{
+            'product_id': product.id,
+            'workplace_id': self.workplace.id,
+            'origin': 'SO%s' % i,
+        } for i in range(3)])
+        
+        productions.action_generate_workplace_tasks()
+        productions.action_generate_workplace_tasks()
+        
+        tasks = self.WorkTask.search([('production_id', 'in', productions.ids)])
+        self.assertEqual(len(tasks), 3)
+        self.assertEqual(set(tasks.mapped('customer_order_number')), {'SO0', 'SO1', 'SO2'})
+        self.assertEqual(tasks.allowed_operators, self.workplace.operator_ids)
+        self.assertEqual(set(tasks.mapped('workplace_id.id')), {self.workplace.id})
+
+    def test_generate_skips_archived_productions(self):
+        product = self.env['product.product'].create({'name': 'Test Part', 'type': 'consu'})
+        production = self.env['mrp.production'].create({
+            'product_id': product.id,
+            'workplace_id': self.workplace.id,
+            'origin': 'SO9',
+        })
+        production.action_confirm()
+        self.WorkTask._cron_generate_from_productions()
+        task = production.workplace_task_ids
+        self.assertEqual(len(task), 1)
+        task.write({'status': 'completed', 'date_done': '2000-01-01 00:00:00'})
+        
+        self.WorkTask._cron_archive_finished_tasks()
+        self.WorkTask._cron_generate_from_productions()
+        
+        self.assertFalse(task.exists())
+        self.assertEqual(production.state, 'confirmed')
+        self.assertFalse(production.workplace_task_ids)
+        self.assertEqual(production.workplace_task_history_ids.task_ref, task.id)
+
+    def test_task_events(self):
+        task = self.WorkTask.create({
+            'name': 'Test Task',
+            'workplace_id': self.workplace.id,
+            'allowed_operators': [(4, self.user1.id)],
+        })
+        
+        task.with_user(self.user1).action_start_work()
+        wizard = self.env['workplace.cancel.wizard'].with_user(self.user1).create({
+            'task_ids': task.ids,
+            'cancel_reason': 'No material',
+        })
+        wizard.action_confirm_cancel()
+        
+        self.assertEqual(task.status, 'cancelled')
+        self.assertFalse(task.notes)
+        self.assertEqual(task.event_ids.mapped('event_type'), ['cancel', 'start'])
+        cancel_event = task.event_ids[0]
+        self.assertEqual(cancel_event.reason, 'No material')
+        self.assertEqual(cancel_event.user_id, self.user1)
+        self.assertEqual(cancel_event.workplace_id, self.workplace)
+
+    def test_workplace_stats(self):
+        Stats = self.env['workplace.stats']
+        tasks = self.WorkTask.create([{
+            'name': 'Stats Task %s' % i,
+            'workplace_id': self.workplace.id,
+            'allowed_operators': [(4, self.user1.id)],
+        } for i in range(3)])
+        
+        tasks.with_user(self.user1).action_start_work()
+        tasks[:2].action_complete()
+        self.env['workplace.defect.wizard'].create({
+            'task_ids': tasks[2].ids,
+            'defect_reason': 'Scratch',
+        }).action_confirm_defect()
+        self.env['workplace.job']._cron_run()
+        
+        stats = Stats.search([('workplace_id', '=', self.workplace.id)])
+        self.assertEqual(len(stats), 1)
+        self.assertEqual(stats.completed_count, 2)
+        self.assertEqual(stats.defect_count, 1)
+        self.assertEqual(stats.capacity, 2)
+        self.assertAlmostEqual(stats.defect_rate, 100.0 / 3, places=2)
+        
+        # Completing again (list multi-select, second operator) books nothing.
+        with self.assertRaises(ValidationError):
+            tasks[:2].action_complete()
+        self.assertEqual(stats.completed_count, 2)
+        
+        Stats._rebuild()
+        stats = Stats.search([('workplace_id', '=', self.workplace.id)])
+        self.assertEqual((stats.completed_count, stats.defect_count), (2, 1))
+
+    def test_workplace_stats_shift_split(self):
+        Stats = self.env['workplace.stats']
+        start = fields.Datetime.to_datetime('2024-01-01 07:00:00')
+        end = fields.Datetime.to_datetime('2024-01-01 09:30:00')
+        
+        parts = list(Stats._split_by_shift(start, end, 8))
+        self.assertEqual([(shift, minutes) for _day, shift, minutes in parts], [(1, 60.0), (2, 90.0)])
+
+    def test_dispatcher(self):
+        Dispatcher = self.env['workplace.dispatcher']
+        user3 = self.User.create({'name': 'Test User 3', 'login': 'testuser3'})
+        down = self.Workplace.create({
+            'name': 'Down Workplace',
+            'code': 'WP_TEST_TASK_DOWN',
+            'capacity': 5,
+            'status': 'maintenance',
+        })
+        all_users = [(6, 0, [self.user1.id, self.user2.id, user3.id])]
+        urgent, only_user1, later, blocked = self.WorkTask.create([{
+            'name': 'Urgent',
+            'workplace_id': self.workplace.id,
+            'allowed_operators': all_users,
+            'order_date': '2024-01-01 08:00:00',
+        }, {
+            'name': 'Only User 1',
+            'workplace_id': self.workplace.id,
+            'allowed_operators': [(4, self.user1.id)],
+            'order_date': '2024-01-01 09:00:00',
+        }, {
+            'name': 'Later',
+            'workplace_id': self.workplace.id,
+            'allowed_operators': all_users,
+            'order_date': '2024-01-01 10:00:00',
+        }, {
+            'name': 'Blocked',
+            'workplace_id': down.id,
+            'allowed_operators': all_users,
+            'order_date': '2024-01-01 07:00:00',
+        }])
+        
+        assignments = dict(Dispatcher._dispatch())
+        
+        # Capacity 2: the two oldest tasks of the workplace, and the scarce
+        # operator is kept for the task only they may work on.
+        self.assertEqual(set(assignments), {urgent.id, only_user1.id})
+        self.assertEqual(assignments[only_user1.id], self.user1.id)
+        self.assertNotEqual(assignments[urgent.id], self.user1.id)
+        self.assertEqual(only_user1.proposed_user_id, self.user1)
+        self.assertFalse(later.proposed_user_id)
+        self.assertFalse(blocked.proposed_user_id)
+        
+        only_user1.with_user(self.user1).action_start_work()
+        self.assertFalse(only_user1.proposed_user_id)
+
+    def test_reap_stale_operators(self):
+        Load = self.env['workplace.operator.load']
+        user3 = self.User.create({'name': 'Test User 3', 'login': 'testuser3'})
+        self.workplace.capacity = 3
+        stale, fresh, no_terminal = self.WorkTask.create([{
+            'name': 'Stale Task',
+            'workplace_id': self.workplace.id,
+            'allowed_operators': [(4, self.user1.id)],
+        }, {
+            'name': 'Fresh Task',
+            'workplace_id': self.workplace.id,
+            'allowed_operators': [(4, self.user2.id)],
+        }, {
+            'name': 'Form Task',
+            'workplace_id': self.workplace.id,
+            'allowed_operators': [(4, user3.id)],
+        }])
+        stale.with_user(self.user1).action_start_work()
+        fresh.with_user(self.user2).action_start_work()
+        no_terminal.with_user(user3).action_start_work()
+        Load.search([('user_id', '=', self.user1.id)]).last_heartbeat = '2000-01-01 00:00:00'
+        Load.search([('user_id', '=', user3.id)]).since = '2000-01-01 00:00:00'
+        Load.with_user(self.user2)._heartbeat()
+        
+        Load._cron_reap_stale_operators()
+        
+        self.assertFalse(stale.current_operator_ids)
+        self.assertNotIn(self.user1, self.workplace.current_operator_ids)
+        self.assertEqual(Load.search([('user_id', '=', self.user1.id)]).task_count, 0)
+        self.assertEqual(stale.event_ids[0].event_type, 'leave')
+        self.assertEqual(stale.event_ids[0].user_id, self.user1)
+        self.assertIn(self.user2, fresh.current_operator_ids)
+        self.assertIn(self.user2, self.workplace.current_operator_ids)
+        # Without a heartbeat ever sent, the presence is not reaped.
+        self.assertIn(user3, no_terminal.current_operator_ids)
+        self.assertIn(user3, self.workplace.current_operator_ids)
+        self.assertEqual(self.workplace.occupancy, 2)
+
+    def test_apply_terminal_operations(self):
+        task, taken = self.WorkTask.create([{
+            'name': 'Offline Task',
+            'workplace_id': self.workplace.id,
+            'allowed_operators': [(4, self.user1.id)],
+        }, {
+            'name': 'Taken Task',
+            'workplace_id': self.workplace.id,
+            'allowed_operators': [(4, self.user1.id), (4, self.user2.id)],
+        }])
+        taken.with_user(self.user2).action_start_work()
+        taken.with_user(self.user2).action_complete()
+        operations = [
+            {'uuid': 'op-1', 'task_id': task.id, 'action': 'claim'},
+            {'uuid': 'op-2', 'task_id': taken.id, 'action': 'claim'},
+            {'uuid': 'op-3', 'task_id': task.id, 'action': 'complete'},
+        ]
+        
+        results = self.WorkTask.with_user(self.user1)._apply_terminal_operations(operations)
+        
+        self.assertEqual([result['status'] for result in results], ['ok', 'conflict', 'ok'])
+        self.assertEqual(task.status, 'completed')
+        self.assertEqual(taken.status, 'completed')
+        self.assertFalse(taken.current_operator_ids)
+        self.assertEqual(set(task.event_ids.mapped('client_uuid')), {'op-1', 'op-3'})
+        
+        results = self.WorkTask.with_user(self.user1)._apply_terminal_operations(operations[:1])
+        self.assertTrue(results[0]['duplicate'])
+        self.assertEqual(len(task.event_ids), 2)
+        
+        # Left in a shared terminal's queue by user1, sent in user2's session.
+        results = self.WorkTask.with_user(self.user2)._apply_terminal_operations([
+            {'uuid': 'op-4', 'uid': self.user1.id, 'task_id': taken.id, 'action': 'claim'},
+        ])
+        self.assertEqual(results[0]['status'], 'error')
+        self.assertFalse(taken.event_ids.filtered(lambda event: event.client_uuid == 'op-4'))
+
+    def test_replayed_complete_after_defect(self):
+        task = self.WorkTask.create({
+            'name': 'Supervised Task',
+            'workplace_id': self.workplace.id,
+            'allowed_operators': [(4, self.user1.id)],
+        })
+        task.with_user(self.user1).action_start_work()
+        self.env['workplace.defect.wizard'].create({
+            'task_ids': task.ids,
+            'defect_reason': 'Crack',
+        }).action_confirm_defect()
+        date_done = task.date_done
+        
+        results = self.WorkTask.with_user(self.user1)._apply_terminal_operations([
+            {'uuid': 'op-late', 'task_id': task.id, 'action': 'complete'},
+        ])
+        
+        self.assertEqual(results[0]['status'], 'conflict')
+        self.assertEqual(task.status, 'defect')
+        self.assertEqual(task.date_done, date_done)
+        self.assertFalse(task.event_ids.filtered(lambda event: event.event_type == 'complete'))
+
+    def test_action_instrumentation(self):
+        Stat = self.env['workplace.action.stat']
+        task = self.WorkTask.create({
+            'name': 'Timed Task',
+            'workplace_id': self.workplace.id,
+            'allowed_operators': [(4, self.user1.id)],
+        })
+        task.with_user(self.user1).action_start_work()
+        self.env['workplace.defect.wizard'].with_user(self.user1).create({
+            'task_ids': task.ids,
+            'defect_reason': 'Scratched',
+        }).action_confirm_defect()
+        
+        stats = Stat.search([('user_id', '=', self.user1.id)])
+        self.assertEqual(sorted(stats.mapped('action')), ['defect_wizard', 'start_work'])
+        self.assertEqual(stats.workplace_id, self.workplace)
+        self.assertTrue(all(stat.query_count > 0 for stat in stats))
+        
+        self.env['workplace.action.stat.report'].invalidate_model()
+        report = self.env['workplace.action.stat.report'].search([
+            ('action', '=', 'start_work'),
+            ('workplace_id', '=', self.workplace.id),
+        ])
+        self.assertEqual(report.call_count, 1)
+
+    def test_claim_info_cache(self):
+        task = self.WorkTask.create({
+            'name': 'Cached Task',
+            'workplace_id': self.workplace.id,
+            'allowed_operators': [(4, self.user1.id)],
+        })
+        self.assertEqual(self.Workplace._get_claim_info(self.workplace.id), (2, 'available', True, False))
+        
+        self.workplace.action_set_maintenance()
+        self.assertEqual(self.Workplace._get_claim_info(self.workplace.id)[1], 'maintenance')
+        with self.assertRaises(ValidationError):
+            task.with_user(self.user1).action_start_work()
+        
+        self.workplace.action_set_available()
+        task.with_user(self.user1).action_start_work()
+        self.assertEqual(task.status, 'in_progress')
+
+    def test_bulk_defect_wizard(self):
+        tasks = self.WorkTask.create([{
+            'name': 'Bad Part %s' % i,
+            'workplace_id': self.workplace.id,
+            'allowed_operators': [(4, self.user1.id)],
+        } for i in range(5)])
+        tasks[:3].with_user(self.user1).action_start_work()
+        
+        wizard = self.env['workplace.defect.wizard'].with_context(
+            active_model='workplace.task', active_ids=tasks.ids,
+        ).create({'defect_reason': 'Bad batch of blanks'})
+        self.assertEqual(wizard.task_ids, tasks)
+        wizard.action_confirm_defect()
+        
+        self.assertEqual(set(tasks.mapped('status')), {'defect'})
+        self.assertEqual(set(tasks.mapped('defect_reason')), {'Bad batch of blanks'})
+        self.assertFalse(tasks.current_operator_ids)
+        self.assertFalse(self.workplace.current_operator_ids)
+        self.assertEqual(self.workplace.occupancy, 0)
+        self.assertEqual(len(tasks.event_ids.filtered(lambda e: e.event_type == 'defect')), 5)
+        
+        with self.assertRaises(ValidationError):
+            self.env['workplace.cancel.wizard'].create({
+                'task_ids': tasks.ids,
+                'cancel_reason': 'Too late',
+            }).action_confirm_cancel()
+
+    def test_claimable_tasks_keyset(self):
+        tasks = self.WorkTask.create([{
+            'name': 'Page Task %s' % i,
+            'workplace_id': self.workplace.id,
+            'allowed_operators': [(4, self.user1.id)],
+            'order_date': '2024-01-01 08:00:00' if i < 2 else '2024-01-02 08:00:00',
+        } for i in range(3)])
+        WorkTask = self.WorkTask.with_user(self.user1)
+        
+        seen = []
+        cursor = None
+        while True:
+            page = WorkTask._get_claimable_tasks(self.workplace.id, limit=2, cursor=cursor)
+            seen += [task['id'] for task in page]
+            if len(page) < 2:
+                break
+            cursor = WorkTask._encode_cursor(page[-1]['order_date'], page[-1]['id'])
+        self.assertEqual(seen, tasks.ids)
+        self.assertEqual(self.WorkTask.search([('id', 'in', tasks.ids)]).ids, tasks.ids)
+
+    def test_scan_code(self):
+        task, other = self.WorkTask.create([{
+            'name': 'Scanned Task',
+            'workplace_id': self.workplace.id,
+            'allowed_operators': [(4, self.user1.id)],
+        }, {
+            'name': 'Other Task',
+            'workplace_id': self.workplace.id,
+            'allowed_operators': [(4, self.user2.id)],
+        }])
+        self.assertTrue(task.scan_code.startswith('WT'))
+        self.assertNotEqual(task.scan_code, other.scan_code)
+        self.assertNotEqual(task.copy().scan_code, task.scan_code)
+        
+        WorkTask = self.WorkTask.with_user(self.user1)
+        self.assertEqual(WorkTask._find_by_scan_code(' %s ' % task.scan_code.lower()), task)
+        self.assertFalse(WorkTask._find_by_scan_code('NOPE'))
+        
+        result = WorkTask._scan_to_claim(task.scan_code, uuid='scan-1')
+        self.assertEqual(result['status'], 'ok')
+        self.assertEqual(task.status, 'in_progress')
+        # Re-sent after a timeout: the task is no longer ready, but it is the
+        # same scan.
+        result = WorkTask._scan_to_claim(task.scan_code, uuid='scan-1')
+        self.assertEqual(result['status'], 'ok')
+        self.assertTrue(result['duplicate'])
+        task.action_complete()
+        
+        result = WorkTask._scan_to_claim(task.scan_code)
+        self.assertEqual(result['status'], 'conflict')
+        self.assertEqual(task.status, 'completed')
+        self.assertNotIn(self.user1, self.workplace.current_operator_ids)
+
+    def test_job_queue(self):
+        Job = self.env['workplace.job']
+        Request = self.env['maintenance.request']
+        equipment = self.env['maintenance.equipment'].create({'name': 'Test Press'})
+        self.workplace.equipment_ids = [(4, equipment.id)]
+        self.env['ir.config_parameter'].sudo().set_param('workplace_arm.defect_opens_maintenance', True)
+        tasks = self.WorkTask.create([{
+            'name': 'Queued Defect %s' % i,
+            'workplace_id': self.workplace.id,
+            'allowed_operators': [(4, self.user1.id)],
+        } for i in range(2)])
+        
+        self.env['workplace.defect.wizard'].create({
+            'task_ids': tasks.ids,
+            'defect_reason': 'Cracked',
+        }).action_confirm_defect()
+        job = Job.search([('method_name', '=', '_job_after_finish')])
+        self.assertEqual(job.state, 'pending')
+        self.assertEqual(job.record_ids, tasks.ids)
+        self.assertFalse(Request.search([('equipment_id', '=', equipment.id)]))
+        
+        Job._cron_run()
+        self.assertEqual(job.state, 'done')
+        self.assertEqual(self.env['workplace.stats'].search([('workplace_id', '=', self.workplace.id)]).defect_count, 2)
+        self.assertEqual(len(Request.search([('equipment_id', '=', equipment.id)])), 1)
+        
+        broken = Job._enqueue(tasks, '_no_such_method')
+        Job._cron_run()
+        self.assertEqual(broken.state, 'pending')
+        self.assertEqual(broken.attempts, 1)
+        self.assertTrue(broken.last_error)
+
+    def test_equipment_down(self):
+        Request = self.env['maintenance.request']
+        press, lathe = self.env['maintenance.equipment'].create([{'name': 'Test Press'}, {'name': 'Test Lathe'}])
+        other = self.Workplace.create({
+            'name': 'Lathe Workplace',
+            'code': 'WP_TEST_TASK_LATHE',
+            'equipment_ids': [(4, lathe.id)],
+        })
+        self.workplace.equipment_ids = [(4, press.id), (4, lathe.id)]
+        task = self.WorkTask.create({
+            'name': 'Pressing',
+            'workplace_id': self.workplace.id,
+            'allowed_operators': [(4, self.user1.id)],
+        })
+        self.assertFalse(self.workplace.equipment_down)
+        
+        request = Request.create({'name': 'Press leaks oil', 'equipment_id': press.id})
+        self.assertTrue(self.workplace.equipment_down)
+        self.assertFalse(other.equipment_down)
+        with self.assertRaises(ValidationError):
+            task.with_user(self.user1).action_start_work()
+        
+        done_stage = self.env['maintenance.stage'].search([('done', '=', True)], limit=1)
+        request.stage_id = done_stage
+        self.assertFalse(self.workplace.equipment_down)
+        task.with_user(self.user1).action_start_work()
+        self.assertEqual(task.status, 'in_progress')
+        
+        lathe_request = Request.create({'name': 'Lathe check', 'equipment_id': lathe.id})
+        self.assertTrue(self.workplace.equipment_down)
+        self.assertTrue(other.equipment_down)
+        lathe_request.unlink()
+        self.assertFalse(self.workplace.equipment_down)
+        self.assertFalse(other.equipment_down)
+
+    def test_bulk_cancel_rules(self):
+        started, waiting = self.WorkTask.create([{
+            'name': 'Started by User 1',
+            'workplace_id': self.workplace.id,
+            'allowed_operators': [(4, self.user1.id), (4, self.user2.id)],
+        }, {
+            'name': 'Waiting',
+            'workplace_id': self.workplace.id,
+            'allowed_operators': [(4, self.user1.id)],
+        }])
+        started.with_user(self.user1).action_start_work()
+        Wizard = self.env['workplace.cancel.wizard']
+        
+        with self.assertRaises(ValidationError):
+            Wizard.with_user(self.user2).create({
+                'task_ids': started.ids,
+                'cancel_reason': 'Not mine',
+            }).action_confirm_cancel()
+        with self.assertRaises(ValidationError):
+            Wizard.with_user(self.user1).create({
+                'task_ids': (started | waiting).ids,
+                'cancel_reason': 'Not started',
+            }).action_confirm_cancel()
+        self.assertEqual(started.status, 'in_progress')
+        
+        Wizard.with_user(self.user1).create({
+            'task_ids': started.ids,
+            'cancel_reason': 'No material',
+        }).action_confirm_cancel()
+        self.assertEqual(started.status, 'cancelled')
@@ -1,40 +1,45 @@
 from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError
 
+from odoo.addons.workplace_arm.models.workplace_action_stat import instrumented
+
 
 class CancelWizard(models.TransientModel):
     _name = 'workplace.cancel.wizard'
     _description = 'Cancel Task Wizard'
 
-    task_id = fields.Many2one('workplace.task', string='Task', required=True)
+    task_ids = fields.Many2many('workplace.task', string='Tasks', required=True)
     cancel_reason = fields.Text(string='Cancel Reason', required=True, 
                                help='Please describe the reason for cancelling this task')
     
     @api.model
     def default_get(self, fields_list):
         res = super().default_get(fields_list)
-        if 'task_id' in fields_list and self.env.context.get('active_id'):
-            res['task_id'] = self.env.context['active_id']
+        if 'task_ids' in fields_list:
+            task_ids = self.env.context.get('active_ids') or [self.env.context.get('active_id')]
+            res['task_ids'] = [(6, 0, [task_id for task_id in task_ids if task_id])]
         return res
     
+    @instrumented('cancel_wizard', 'task_ids.workplace_id')
     def action_confirm_cancel(self):
         if not self.cancel_reason.strip():  # pyright: ignore[reportAttributeAccessIssue]
             raise ValidationError(_('Cancel reason is required.'))
         
-        # Preserve original notes
-        original_notes = self.task_id.notes or ""  # pyright: ignore[reportAttributeAccessIssue]
-        cancel_note = f"Отменено: {self.cancel_reason}"
-        
-        if original_notes:
-            new_notes = f"{original_notes}\n{cancel_note}"
-        else:
-            new_notes = cancel_note
-            
-        self.task_id.write({  # pyright: ignore[reportAttributeAccessIssue]
-            'status': 'cancelled',
-            'notes': new_notes
-        })
-        
-        self.task_id._clear_all_operators()  # pyright: ignore[reportAttributeAccessIssue]
+        failed = self.task_ids._finish_with_reason(  # pyright: ignore[reportAttributeAccessIssue]
+            'cancelled',
+            self.cancel_reason,
+        )
         
+        if failed:
+            return {
+                'type': 'ir.actions.client',
+                'tag': 'display_notification',
+                'params': {
+                    'title': _('Some tasks were not updated'),
+                    'message': ', '.join(failed.mapped('name')),
+                    'type': 'warning',
+                    'sticky': True,
+                    'next': {'type': 'ir.actions.act_window_close'},
+                },
+            }
         return {'type': 'ir.actions.act_window_close'}
@@ -1,31 +1,46 @@
 from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError
 
+from odoo.addons.workplace_arm.models.workplace_action_stat import instrumented
+
 
 class DefectWizard(models.TransientModel):
     _name = 'workplace.defect.wizard'
     _description = 'Defect Reason Wizard'
 
-    task_id = fields.Many2one('workplace.task', string='Task', required=True)
+    task_ids = fields.Many2many('workplace.task', string='Tasks', required=True)
     defect_reason = fields.Text(string='Defect Reason', required=True, 
                                help='Please describe the reason for the defect')
     
     @api.model
     def default_get(self, fields_list):
         res = super().default_get(fields_list)
-        if 'task_id' in fields_list and self.env.context.get('active_id'):
-            res['task_id'] = self.env.context['active_id']
+        if 'task_ids' in fields_list:
+            task_ids = self.env.context.get('active_ids') or [self.env.context.get('active_id')]
+            res['task_ids'] = [(6, 0, [task_id for task_id in task_ids if task_id])]
         return res
     
+    @instrumented('defect_wizard', 'task_ids.workplace_id')
     def action_confirm_defect(self):
         if not self.defect_reason.strip():  # pyright: ignore[reportAttributeAccessIssue]
             raise ValidationError(_('Defect reason is required.'))
         
-        self.task_id.write({  # pyright: ignore[reportAttributeAccessIssue]
-            'status': 'defect',
-            'defect_reason': self.defect_reason
-        })
-        
-        self.task_id._clear_all_operators()  # pyright: ignore[reportAttributeAccessIssue]
+        failed = self.task_ids._finish_with_reason(  # pyright: ignore[reportAttributeAccessIssue]
+            'defect',
+            self.defect_reason,
+            {'defect_reason': self.defect_reason},
+        )
         
+        if failed:
+            return {
+                'type': 'ir.actions.client',
+                'tag': 'display_notification',
+                'params': {
+                    'title': _('Some tasks were not updated'),
+                    'message': ', '.join(failed.mapped('name')),
+                    'type': 'warning',
+                    'sticky': True,
+                    'next': {'type': 'ir.actions.act_window_close'},
+                },
+            }
         return {'type': 'ir.actions.act_window_close'}